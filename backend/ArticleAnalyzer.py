@@ -1,36 +1,50 @@
-from datetime import datetime
+import os
+import time
 import requests
 import concurrent.futures
-from bs4 import BeautifulSoup
-from tldextract import tldextract
+import multiprocessing
 
 from ArticleExtractor import ArticleExtractor
+from analysis_pipeline import Pipeline, Stage, get_stage_cache
+from content_scoring import find_text_rich_node
+from date_extraction import find_date
+from domains import domain_name, domain_names
+from driver_pool import get_driver_pool
+from html_parsing import make_soup
+from http_client import get_http_client
 import random
-import json
-from typing import Optional, List, Dict
+from typing import Callable, Optional, List, Dict
 from urllib.parse import urljoin, urlparse
 import re
+from search_cache import get_search_cache, normalize_query
+from similarity import similarity_scores
+from url_normalization import canonicalize_url, find_canonical_url
+from spell_check import get_spell_checker
 from website_checker import check_website_score
 from textblob import TextBlob
-from spellchecker import SpellChecker
+
+MODEL_API_URL = os.getenv("MODEL_API_URL", "https://checkmate-api-1029076451566.us-central1.run.app")
+
+# Shared deadline, in seconds, for the per-article classifier calls
+MODEL_CALLS_DEADLINE = float(os.getenv("MODEL_CALLS_DEADLINE", 120))
+
+# Extraction workers are forked from a single-threaded fork server rather than
+# from this (multi-threaded) process, so they never inherit a lock another
+# thread was holding. The server imports this module once up front, so new
+# workers start without re-importing it.
+_extraction_context = multiprocessing.get_context('forkserver')
+_extraction_context.set_forkserver_preload([__name__])
+
 
 def get_misspellings(text: str):
-    # 1) Create a local SpellChecker instance
-    spell = SpellChecker()
-    # 2) Pull out only “words” of letters/apostrophes (2+ chars)
-    raw = re.findall(r"\b[a-zA-Z']{2,}\b", text)
-    # 3) Drop tokens that start with an uppercase letter
-    filtered = [tok for tok in raw if not tok[0].isupper()]
-    # 4) Lowercase for spell-checking
-    words = [w.lower() for w in filtered]
-    # 5) Spell-check with our local instance
-    misspelled = spell.unknown(words)
-    return words, misspelled
+    """Words checked and the set of misspelled ones, using the shared spell checker."""
+    result = get_spell_checker().check(text)
+    return result.words, result.misspelled
 
 def normalize_domain(url: str) -> str:
     """
-    Normalize domain names using tldextract to properly handle
-    different subdomains and variations of the same publisher.
+    Normalize domain names to properly handle different subdomains and
+    variations of the same publisher.
 
     Examples:
     - www.bbc.com -> bbc
@@ -48,47 +62,40 @@ def normalize_domain(url: str) -> str:
         return ""
 
     try:
-        # Extract domain parts using tldextract
-        extracted = tldextract.extract(url)
-
-        # Return the registered domain (without subdomains)
-        return extracted.domain
+        return domain_name(url)
     except Exception as e:
         print(f"Error normalizing domain for {url}: {e}")
         return url  # Return the original URL if parsing fails
 
 
 def check_similarity(text1: str, text2: str) -> float:
-    import os
-    from google import genai
-    import numpy as np
+    """Similarity of two texts using the configured similarity backend."""
+    return similarity_scores(text2, [text1])[0]
 
-    # 1) Grab your key (now you know it’s valid)
-    api_key = os.getenv("GENAI_API_KEY")
-    if not api_key:
-        raise RuntimeError("GENAI_API_KEY is not set")
 
-    client = genai.Client(api_key=api_key)
+def _score_similar_articles(main_article: dict, articles: List[dict]) -> List[dict]:
+    """
+    Set `similarity_score` on every candidate article.
 
-    # 2) Embed both texts
-    resp1 = client.models.embed_content(
-        model="text-embedding-004",
-        contents=text1,
-    )
-    resp2 = client.models.embed_content(
-        model="text-embedding-004",
-        contents=text2,
-    )
+    All candidates are scored in one call to the configured similarity
+    backend; with Gemini that is one batched embedding request (minus anything
+    already cached) instead of two requests per candidate.
+    Returns the articles that could be scored.
+    """
+    if not articles:
+        return []
 
-    v1 = np.array(resp1.embeddings[0].values)
-    v2 = np.array(resp2.embeddings[0].values)
+    main_clean = ' '.join(main_article['content'].split())
+    texts = [' '.join(article['content'].split()) for article in articles]
+    try:
+        scores = similarity_scores(main_clean, texts)
+    except Exception as e:
+        print(f"[DEBUG] ArticleAnalyzer: Error scoring similar articles: {e}")
+        return []
 
-    # 3) Compute cosine similarity
-    dot = np.dot(v1, v2)
-    norm = np.linalg.norm(v1) * np.linalg.norm(v2)
-    if norm == 0:
-        return 0.0
-    return float(dot / norm)
+    for article, score in zip(articles, scores):
+        article['similarity_score'] = score
+    return articles
 
 def normalize_url(url: str, base_url: str) -> Optional[str]:
     """Normalize relative URLs to absolute URLs."""
@@ -140,10 +147,9 @@ def find_enhanced_content(soup):
             print(f"Error using enhanced selector {tag} with attrs {attrs}: {e}")
 
     try:
-        divs = soup.find_all("div")
-        text_rich_divs = [div for div in divs if len(div.get_text(strip=True)) > 300]
-        if text_rich_divs:
-            candidate = max(text_rich_divs, key=lambda d: len(d.get_text(strip=True)))
+        # One bottom-up pass instead of get_text() on every nested div
+        candidate = find_text_rich_node(soup, "div", min_length=300)
+        if candidate:
             return candidate
     except Exception as e:
         print(f"Error finding text-rich div: {e}")
@@ -171,10 +177,9 @@ def find_main_content(soup):
             continue
 
     try:
-        divs = soup.find_all("div")
-        text_rich_divs = [div for div in divs if len(div.get_text(strip=True)) > 300]
-        if text_rich_divs:
-            candidate = max(text_rich_divs, key=lambda d: len(d.get_text(strip=True)))
+        # One bottom-up pass instead of get_text() on every nested div
+        candidate = find_text_rich_node(soup, "div", min_length=300)
+        if candidate:
             return candidate
     except Exception as e:
         print(f"Error finding text-rich div: {e}")
@@ -228,96 +233,6 @@ def clean_content(element):
         return ''
 
 
-def find_date(soup):
-    """Find the publication date using various methods, copied from ArticleExtractor."""
-    date_patterns = [
-        r'\d{4}-\d{2}-\d{2}',
-        r'\d{1,2}\s+(?:January|February|March|April|May|June|July|August|September|October|November|December)\s+\d{4}',
-        r'(?:January|February|March|April|May|June|July|August|September|October|November|December)\s+\d{1,2},?\s+\d{4}',
-        r'\d{1,2}/\d{1,2}/\d{4}',
-        r'(\d+)\s*(weeks?|months?|years?)\s+ago',
-        r'half\s+an?\s+(hour|day)\s+ago',
-        r'a\s+few\s+(minutes|hours|days|weeks)\s+ago',
-        r'yesterday'
-    ]
-
-    for meta_property in [
-        'article:published_time',
-        'og:published_time',
-        'publication_date',
-        'date',
-        'datePublished',
-        'publish_date'
-    ]:
-        try:
-            meta = (soup.find('meta', property=meta_property)
-                    or soup.find('meta', attrs={'name': meta_property}))
-            if meta and meta.get('content'):
-                date_str = meta['content'].split('T')[0]
-                standardized = standardize_date(date_str)
-                if standardized:
-                    return standardized
-        except Exception as e:
-            print(f"Error parsing meta date ({meta_property}): {e}")
-
-    script_tags = soup.find_all('script', type='application/ld+json')
-    for script in script_tags:
-        try:
-            data = json.loads(script.string)
-            if isinstance(data, dict):
-                date = data.get('datePublished') or data.get('dateCreated')
-                if date:
-                    standardized = standardize_date(date.split('T')[0])
-                    if standardized:
-                        return standardized
-        except Exception as e:
-            print(f"Error parsing JSON-LD date: {e}")
-
-    try:
-        time_tag = soup.find('time')
-        if time_tag:
-            datetime_attr = time_tag.get('datetime') or time_tag.get('content')
-            if datetime_attr:
-                standardized = standardize_date(datetime_attr.split('T')[0])
-                if standardized:
-                    return standardized
-    except Exception as e:
-        print(f"Error parsing time tag: {e}")
-
-    for pattern in date_patterns:
-        try:
-            date_match = re.search(pattern, str(soup))
-            if date_match:
-                standardized = standardize_date(date_match.group())
-                if standardized:
-                    return standardized
-        except Exception as e:
-            print(f"Error matching date pattern '{pattern}': {e}")
-
-    return None
-
-
-def standardize_date(date_str):
-    """Standardize date to YYYY-MM-DD format, copied from ArticleExtractor."""
-    date_formats = [
-        '%Y-%m-%d',
-        '%B %d, %Y',
-        '%d %B %Y',
-        '%m/%d/%Y',
-        '%d/%m/%Y',
-        '%Y/%m/%d',
-    ]
-    date_str = date_str.strip()
-    for fmt in date_formats:
-        try:
-            parsed_date = datetime.strptime(date_str, fmt)
-            return parsed_date.strftime('%Y-%m-%d')
-        except ValueError:
-            continue
-    print(f"Could not parse date: {date_str}")
-    return None
-
-
 def is_valid_content(content: str) -> bool:
     """
     Check if the extracted content is valid and meaningful.
@@ -376,9 +291,9 @@ def validate_article_data(article_data: dict) -> bool:
 
 def _extract_with_requests(url: str, min_text_length: int = 100):
     try:
-        resp = requests.get(url, timeout=10)
+        resp = get_http_client().get(url, timeout=10)
         resp.raise_for_status()
-        soup = BeautifulSoup(resp.text, "html.parser")
+        soup = make_soup(resp.text)
 
         # Title extraction using enhanced methods
         title = find_enhanced_title(soup) or find_title(soup)
@@ -388,7 +303,7 @@ def _extract_with_requests(url: str, min_text_length: int = 100):
         text_content = clean_content(content_element) if content_element else ''
 
         # Date extraction
-        date = find_date(soup)
+        date = find_date(soup, urlparse(url).hostname)
 
         # If the text is too short or contains error indicators, return None
         if len(text_content) < min_text_length:
@@ -415,95 +330,152 @@ def _extract_with_requests(url: str, min_text_length: int = 100):
             "content": text_content,
             "date": date,
             "url": url,
+            "canonical_url": find_canonical_url(soup, url),
         }
     except Exception as e:
         print(f"Lightweight fetch failed for {url}: {e}")
         return None
 
-def _extract_article_hybrid(url, main_article=None):
-    article_data = _extract_with_requests(url)
-    if article_data is not None:
-        if main_article is None:
-            # CLEAN AND GET SUBJECTIVITY
-            clean_content = article_data['content'].replace('\n', ' ').replace('\r', ' ')
-            clean_content = ' '.join(clean_content.split())
-            #
-            # ─── SPELL-CHECK via get_misspellings ───
-            words, misspelled = get_misspellings(clean_content)
-
-            article_data['spelling_issues']   = len(misspelled)
-            article_data['linguistic_issues'] = len(misspelled)
-
-            # debug output
-            print(f"[SPELL-CHECK] Vocabulary size: {len(set(words))} unique words")
-            print(f"[SPELL-CHECK] Found {len(misspelled)} misspelled word(s):")
-            if misspelled:
-                print("  " + ", ".join(sorted(misspelled)))
+def _post_model(endpoint: str, payload: dict, timeout: float) -> dict:
+    """POST a payload to the model service and return the decoded JSON."""
+    resp = get_http_client().post(
+        f"{MODEL_API_URL}/{endpoint}",
+        headers={"Content-Type": "application/json"},
+        json=payload,
+        timeout=timeout,
+    )
+    resp.raise_for_status()
+    return resp.json()
 
-            try:
-                resp = requests.post(
-                    "https://checkmate-api-1029076451566.us-central1.run.app/subjectivity",
-                    headers={"Content-Type": "application/json"},
-                    json={"text": clean_content},
-                    timeout=120,
-                )
-                resp.raise_for_status()
-                article_data['objectivity_score'] = resp.json().get('objectivity_prob', -1)
-            except (requests.RequestException, ValueError, KeyError) as e:
-                print(f"Error getting text-based objectivity: {e}")
-                article_data['objectivity_score'] = -1
 
-            # 2) title-based subjectivity
-            try:
-                title_resp = requests.post(
-                    "https://checkmate-api-1029076451566.us-central1.run.app/titleSubjectivity",
-                    headers={"Content-Type": "application/json"},
-                    json={"text": article_data.get("title", "")},
-                    timeout=120,
-                )
-                title_resp.raise_for_status()
-                article_data['title_objectivity_score'] = title_resp.json().get('objectivity_prob', -1)
-                print(f"title_objectivity_score: {article_data['title_objectivity_score']}")
-            except (requests.RequestException, ValueError, KeyError) as e:
-                print(f"Error getting title-based objectivity: {e}")
-                article_data['title_objectivity_score'] = -1
+def _score_main_article(article_data: dict, clean_content: str):
+    """
+    Spell-check the main article and run the model-service classifiers on it.
 
-            # BIAS
+    All classifiers are requested in one /analyze round trip. If the model
+    service can't serve it, the subjectivity, title subjectivity and political
+    bias endpoints are called concurrently instead, within what is left of the
+    same deadline. A call that fails or misses the deadline leaves its fields
+    at their defaults, and the other results are still used.
+    """
+    # ─── SPELL-CHECK: counts and error % in one pass ───
+    spelling = get_spell_checker().check(clean_content)
+
+    article_data['spelling_issues']   = spelling.error_count
+    article_data['linguistic_issues'] = spelling.error_count
+    article_data['pct']               = spelling.error_pct
+
+    # debug output
+    print(f"[SPELL-CHECK] Vocabulary size: {len(set(spelling.words))} unique words")
+    print(f"[SPELL-CHECK] Found {spelling.error_count} misspelled word(s):")
+    if spelling.misspelled:
+        print("  " + ", ".join(sorted(spelling.misspelled)))
+    print(f"[SPELL-CHECK] {spelling.error_count} misspellings out of {len(spelling.words) or 1} words "
+          f"→ {spelling.error_pct:.2f}% errors")
+
+    # Defaults for any call that doesn't come back in time
+    article_data['objectivity_score'] = -1
+    article_data['title_objectivity_score'] = -1
+    article_data['bias_prediction'] = 'Unknown'
+    article_data['bias_probabilities'] = {}
+
+    deadline = time.monotonic() + MODEL_CALLS_DEADLINE
+
+    # One round trip for all three classifiers
+    try:
+        result = _post_model('analyze', {
+            "title": article_data.get("title", ""),
+            "text": clean_content,
+        }, MODEL_CALLS_DEADLINE)
+        for endpoint, key in (('subjectivity', 'subjectivity'),
+                              ('titleSubjectivity', 'title_subjectivity'),
+                              ('political', 'political')):
+            if result.get(key) is not None:
+                _apply_model_result(article_data, endpoint, result[key])
+        if result.get('errors'):
+            print(f"Model service reported errors: {result['errors']}")
+        return
+    except (requests.RequestException, ValueError, KeyError) as e:
+        print(f"Combined /analyze call failed, falling back to separate calls: {e}")
+
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        print("No time left for separate model calls")
+        return
+
+    calls = {
+        'subjectivity': {"text": clean_content},
+        'titleSubjectivity': {"text": article_data.get("title", "")},
+        'political': {"text": clean_content},
+    }
+
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=len(calls))
+    try:
+        future_to_endpoint = {
+            executor.submit(_post_model, endpoint, payload, remaining): endpoint
+            for endpoint, payload in calls.items()
+        }
+        done, not_done = concurrent.futures.wait(future_to_endpoint, timeout=remaining)
+        for future in not_done:
+            print(f"Model call /{future_to_endpoint[future]} missed the {MODEL_CALLS_DEADLINE}s deadline")
+
+        for future in done:
+            endpoint = future_to_endpoint[future]
             try:
-                bias_response = requests.post(
-                    "https://checkmate-api-1029076451566.us-central1.run.app/political",
-                    headers={"Content-Type": "application/json"},
-                    json={"text": clean_content},
-                    timeout=120,
-                )
-                bias_response.raise_for_status()
-                bias_json = bias_response.json()
-                article_data['bias_prediction'] = bias_json.get('prediction', 'Unknown')
-                article_data['bias_probabilities'] = bias_json.get('probabilities', {})
-                print(f"bias_prediction is {article_data['bias_prediction']}")
-                print(f"bias_probabilities are {article_data['bias_probabilities']}")
+                _apply_model_result(article_data, endpoint, future.result())
             except (requests.RequestException, ValueError, KeyError) as e:
-                print(f"Error getting bias data from API: {e}")
-                article_data['bias_prediction'] = 'Unknown'
-                article_data['bias_probabilities'] = {}
-
-        else:
-            # SIMILARITY to main article (unchanged)
-            main_clean = ' '.join(main_article['content'].split())
-            sim_clean = ' '.join(article_data['content'].split())
-            article_data['similarity_score'] = check_similarity(sim_clean, main_clean)
+                print(f"Error calling /{endpoint}: {e}")
+    finally:
+        # Don't block on calls that missed the deadline
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _model_scores_complete(scores: dict) -> bool:
+    """Whether every classifier returned a result, i.e. none is still at its default."""
+    return (bool(scores)
+            and scores.get('objectivity_score', -1) != -1
+            and scores.get('title_objectivity_score', -1) != -1
+            and scores.get('bias_prediction', 'Unknown') != 'Unknown')
+
+
+def _apply_model_result(article_data: dict, endpoint: str, result: dict):
+    """Copy one classifier result into the article fields."""
+    if endpoint == 'subjectivity':
+        article_data['objectivity_score'] = result.get('objectivity_prob', -1)
+    elif endpoint == 'titleSubjectivity':
+        article_data['title_objectivity_score'] = result.get('objectivity_prob', -1)
+        print(f"title_objectivity_score: {article_data['title_objectivity_score']}")
+    else:
+        article_data['bias_prediction'] = result.get('prediction', 'Unknown')
+        article_data['bias_probabilities'] = result.get('probabilities', {})
+        print(f"bias_prediction is {article_data['bias_prediction']}")
+        print(f"bias_probabilities are {article_data['bias_probabilities']}")
+
+
+def _extract_article_hybrid(url, use_browser=True):
+    """
+    Extract an article with plain requests, falling back to a pooled browser.
+
+    Only extracts; scoring is done by the analysis pipeline's stages.
+    """
+    article_data = _extract_with_requests(url)
+    if article_data is not None:
         return article_data
 
+    if not use_browser:
+        return None
+
     try:
-        scrapper = ArticleExtractor()
-        article_data = scrapper.extract_article(url)
+        # Lease a warm browser instead of launching Chrome for every fallback
+        with get_driver_pool().driver() as driver:
+            if driver is None:
+                print(f"Browser-based extraction unavailable for {url}: no driver")
+                return None
+            article_data = ArticleExtractor(driver=driver).extract_article(url)
 
         # Check if we actually got meaningful content
         if not article_data.get('content') or len(article_data.get('content', '')) < 100:
             print(f"Browser-based extraction failed to get sufficient content for {url}")
-
-            if scrapper.driver:
-                scrapper.driver.quit()
             return None
 
         error_indicators = [
@@ -520,181 +492,247 @@ def _extract_article_hybrid(url, main_article=None):
         content = article_data.get('content', '').lower()
         if any(indicator in content for indicator in error_indicators):
             print(f"Browser-based extraction returned error content for {url}")
-            if scrapper.driver:
-                scrapper.driver.quit()
             return None
 
-        if main_article is None:
-            clean_content = ' '.join(article_data['content'].split())
-
-
-            words, misspelled = get_misspellings(clean_content)
-
-            # record counts
-            article_data['spelling_issues']   = len(misspelled)
-            article_data['linguistic_issues'] = len(misspelled)
+        return article_data
+    except Exception as e:
+        print(f"Browser-based extraction failed for {url}: {e}")
+        return None
 
-            # debug output
-            print(f"[SPELL-CHECK] Vocabulary size: {len(set(words))} unique words")
-            print(f"[SPELL-CHECK] Found {len(misspelled)} misspelled word(s):")
-            if misspelled:
-                print("  " + ", ".join(sorted(misspelled)))
+def _extract_similar_with_browser(urls):
+    """
+    Browser fallback for similar articles: every URL is loaded in a tab of the
+    same leased Chrome instance instead of one browser per worker process.
+    """
+    if not urls:
+        return {}
 
-            try:
-                resp = requests.post(
-                    "https://checkmate-api-1029076451566.us-central1.run.app/subjectivity",
-                    headers={"Content-Type": "application/json"},
-                    json={"text": clean_content},
-                    timeout=120,
-                )
-                resp.raise_for_status()
-                article_data['objectivity_score'] = resp.json().get('objectivity_prob', -1)
-            except (requests.RequestException, ValueError, KeyError) as e:
-                print(f"Error getting text-based objectivity: {e}")
-                article_data['objectivity_score'] = -1
+    max_tabs = int(os.getenv("BROWSER_MAX_TABS", 10))
+    try:
+        with get_driver_pool().driver() as driver:
+            if driver is None:
+                print("Browser-based extraction unavailable: no driver")
+                return {}
+            articles = ArticleExtractor(driver=driver).extract_articles(urls, max_tabs=max_tabs)
+    except Exception as e:
+        print(f"Browser-based extraction failed for similar articles: {e}")
+        return {}
 
-            # 2) title-based subjectivity
-            try:
-                title_resp = requests.post(
-                    "https://checkmate-api-1029076451566.us-central1.run.app/titleSubjectivity",
-                    headers={"Content-Type": "application/json"},
-                    json={"text": article_data.get("title", "")},
-                    timeout=120,
-                )
-                title_resp.raise_for_status()
-                article_data['title_objectivity_score'] = title_resp.json().get('objectivity_prob', -1)
-                print(f"title_objectivity_score: {article_data['title_objectivity_score']}")
-            except (requests.RequestException, ValueError, KeyError) as e:
-                print(f"Error getting title-based objectivity: {e}")
-                article_data['title_objectivity_score'] = -1
+    error_indicators = [
+        'could not extract meaningful content',
+        'page load error',
+        'could not initialize driver',
+        'failed to extract',
+        'no content found',
+        'access denied',
+        'robot check',
+        'captcha'
+    ]
 
-            try:
-                bias_response = requests.post(
-                    "https://checkmate-api-1029076451566.us-central1.run.app/political",
-                    headers={"Content-Type": "application/json"},
-                    json={"text": clean_content},
-                    timeout=120,
-                )
-                bias_response.raise_for_status()
-                bias_json = bias_response.json()
-                article_data['bias_prediction'] = bias_json.get('prediction', 'Unknown')
-                article_data['bias_probabilities'] = bias_json.get('probabilities', {})
-            except:
-                article_data['bias_prediction'] = 'Unknown'
-                article_data['bias_probabilities'] = {}
-
-        else:
-            # similarity to main_article unchanged
-            article_data['similarity_score'] = check_similarity(
-                ' '.join(article_data['content'].split()),
-                ' '.join(main_article['content'].split())
-            )
-        if scrapper.driver:
-            scrapper.driver.quit()
-        return article_data
-    except Exception as e:
-        if 'scrapper' in locals() and scrapper.driver:
-            scrapper.driver.quit()
-        return None
+    extracted = {}
+    for article_data in articles:
+        url = article_data['url']
+        content = article_data.get('content', '')
+        if not content or len(content) < 100:
+            print(f"Browser-based extraction failed to get sufficient content for {url}")
+            continue
+        if any(indicator in content.lower() for indicator in error_indicators):
+            print(f"Browser-based extraction returned error content for {url}")
+            continue
+        extracted[url] = article_data
+    return extracted
+
+def _display_article(article):
+    """The fields of a similar article shown to users."""
+    return {
+        'url': article['url'],
+        # Use Google title if available, otherwise fallback to extracted title
+        'title': article.get('google_title', article.get('title', 'Untitled Article')),
+        'similarity_score': article.get('similarity_score', 0.5)
+    }
 
 class ArticleExtractionError(Exception):
     """Raised when an article cannot be extracted properly."""
     pass
 
+
+def extract_main_article(url):
+    """
+    Extract the article being analyzed, raising ArticleExtractionError if it
+    can't be read. The result can be passed to ArticleAnalyzer as the
+    "extract" stage of `known_results`.
+    """
+    article = _extract_article_hybrid(url)
+
+    if article is None:
+        raise ArticleExtractionError(f"Failed to extract content from {url}")
+
+    if not validate_article_data(article):
+        raise ArticleExtractionError(f"Failed to extract meaningful content from {url}")
+
+    print("[DEBUG] ArticleAnalyzer: Main article extracted successfully. Title:", article.get('title'))
+    return article
+
+
 class ArticleAnalyzer:
-    def __init__(self, api_key: str, cx: str, article_url: str):
+    """
+    Analyzes an article as a pipeline of named stages:
+
+        extract -> score, search, credibility -> similar -> reliability
+
+        extract      main article content (cached per URL)
+        score        spell-check and classifier scores (cached per URL)
+        search       Google Custom Search on the title (cached per title)
+        credibility  trusted_websites lookup for the article's domain
+        similar      extraction and similarity scoring of search results
+                     (cached per URL)
+        reliability  reliability model call combining all of the above
+
+    score, search and credibility run concurrently once extraction is done.
+    Cached stages are skipped, and results passed in `known_results` (e.g.
+    a stored extraction) are used as-is. Per-stage timings are kept in
+    `self.timings`.
+
+    `on_progress(event, data)` is called with partial results as stages
+    finish: "article", "objectivity", "bias", "spelling", "credibility",
+    one "similar_article" per scored similar article, and "reliability".
+    """
+
+    def __init__(self, api_key: str, cx: str, article_url: str, known_results: Optional[dict] = None,
+                 on_progress: Optional[Callable[[str, dict], None]] = None):
         print("[DEBUG] ArticleAnalyzer: Initializing for URL:", article_url)
         self.api_key = api_key
         self.cx = cx
+        self.article_url = article_url
+        self.on_progress = on_progress
 
-        # Extract the main article
-        self.article = _extract_article_hybrid(article_url)
-        print("[DEBUG] ArticleAnalyzer: Article title used for search:", self.article.get('title', ''))
-
-        if self.article is None:
-            raise ArticleExtractionError(f"Failed to extract content from {article_url}")
-
-        if not validate_article_data(self.article):
-            raise ArticleExtractionError(f"Failed to extract meaningful content from {article_url}")
+        run = self.pipeline().run(known_results, on_stage=self.__report if on_progress else None)
+        self.results = run.results
+        self.timings = run.timings
 
-        print("[DEBUG] ArticleAnalyzer: Main article extracted successfully. Title:", self.article.get('title'))
-
-        # Retrieve similar articles (in parallel)
-        self.extracted_articles = self.__get_similar_articles()
+        self.article = {**run.results['extract'], **run.results['score'],
+                        'reliability_score': run.results['reliability']}
+        self.extracted_articles = run.results['similar']
         print(f"[DEBUG] ArticleAnalyzer: Retrieved {len(self.extracted_articles)} similar articles.")
-
-        # ─ reliability call ─
-        cred_info  = check_website_score(self.article['url'])
+        print("[DEBUG] ArticleAnalyzer: HTTP connection reuse:", get_http_client().stats())
+
+    def pipeline(self) -> Pipeline:
+        url_key = lambda results: canonicalize_url(self.article_url)
+        return Pipeline([
+            Stage('extract', lambda r: extract_main_article(self.article_url), cache_key=url_key),
+            # Scores with fallback values (model service down or too slow) aren't cached
+            Stage('score', lambda r: self.__score(r['extract']), requires=['extract'], cache_key=url_key,
+                  cacheable=_model_scores_complete),
+            # Cached per normalized query by the search cache
+            Stage('search', lambda r: self.__search(r['extract'].get('title', '')), requires=['extract']),
+            # Reads the database, so it runs in the caller's app context
+            Stage('credibility', lambda r: check_website_score(r['extract']['url']), requires=['extract'],
+                  threaded=False),
+            Stage('similar', lambda r: self.__get_similar_articles(r['extract'], r['search']),
+                  requires=['extract', 'search'], cache_key=url_key),
+            Stage('reliability', lambda r: self.__get_reliability({**r['extract'], **r['score']},
+                                                                   r['credibility'], r['similar']),
+                  requires=['score', 'credibility', 'similar']),
+        ], cache=get_stage_cache())
+
+    def __report(self, stage, result):
+        """Turn a finished stage's result into progress events."""
+        if stage == 'extract':
+            self.on_progress('article', {key: result.get(key) for key in ('url', 'title', 'date')})
+        elif stage == 'score':
+            self.on_progress('objectivity', {
+                'objectivity_score': result.get('objectivity_score'),
+                'title_objectivity_score': result.get('title_objectivity_score'),
+            })
+            self.on_progress('bias', {
+                'bias_prediction': result.get('bias_prediction'),
+                'bias_probabilities': result.get('bias_probabilities'),
+            })
+            self.on_progress('spelling', {
+                'spelling_issues': result.get('spelling_issues'),
+                'linguistic_issues': result.get('linguistic_issues'),
+                'pct': result.get('pct'),
+            })
+        elif stage == 'credibility':
+            self.on_progress('credibility', {'credibility_score': result.get('credibility_score')})
+        elif stage == 'similar':
+            for article in result:
+                self.on_progress('similar_article', _display_article(article))
+        elif stage == 'reliability':
+            self.on_progress('reliability', {'reliability_score': result})
+
+    @staticmethod
+    def __score(article):
+        """Spell-check and classifier fields for the article, without the article itself."""
+        scored = dict(article)
+        clean_content = ' '.join(article['content'].split())
+        _score_main_article(scored, clean_content)
+        return {key: value for key, value in scored.items() if key not in article}
+
+    @staticmethod
+    def __get_reliability(article, cred_info, extracted_articles):
         cred_val   = cred_info.get("credibility_score")
         credibility_score = {0:"credible",1:"mixed",2:"uncredible"}.get(cred_val, "mixed")
         similarity_scores = [
             max(0.0, min(art.get('similarity_score', 0.0), 1.0))
-            for art in self.extracted_articles
+            for art in extracted_articles
         ]
 
-        # ── NEW: spelling error % ──
-        clean = ' '.join(self.article['content'].split())
-        words, misspelled = get_misspellings(clean)
-        total_words = len(words) or 1
-        spelling_error_pct = len(misspelled) / total_words
-        self.article['pct'] = spelling_error_pct
-        print(f"[SPELL-CHECK] {len(misspelled)} misspellings out of {total_words} words "
-              f"→ {spelling_error_pct:.2f}% errors")
+        # Spelling error % was computed alongside the spell-check counts
+        spelling_error_pct = article['pct']
 
         # ─── BUILD UPDATED PAYLOAD ───
         rel_payload = {
-            "bias_probs":            self.article.get('bias_probabilities', {}),
-            "objectivity_score":     self.article.get('objectivity_score', -1),
-            "title_objectivity":     self.article.get('title_objectivity_score', -1),
+            "bias_probs":            article.get('bias_probabilities', {}),
+            "objectivity_score":     article.get('objectivity_score', -1),
+            "title_objectivity":     article.get('title_objectivity_score', -1),
             "credibility_score":     credibility_score,
             "similarity_scores":     similarity_scores,
             "grammatical_error_rate":    spelling_error_pct,
         }
         print("[DEBUG] Reliability payload:", rel_payload)
 
-        print("content:", self.article)
+        print("content:", article)
         try:
-            rel_resp = requests.post(
-                "https://checkmate-api-1029076451566.us-central1.run.app/reliability",
+            rel_resp = get_http_client().post(
+                f"{MODEL_API_URL}/reliability",
                 json=rel_payload, timeout=120
             )
             rel_resp.raise_for_status()
             rel_json = rel_resp.json()
             # <-- pick up the right field:
-            self.article['reliability_score'] = rel_json.get('reliability', -1)
-            print(f"[DEBUG] reliability_score: {self.article['reliability_score']}")
+            reliability_score = rel_json.get('reliability', -1)
+            print(f"[DEBUG] reliability_score: {reliability_score}")
+            return reliability_score
 
         except requests.RequestException as e:
             body = getattr(e.response, 'text', '<no body>')
             print(f"[DEBUG] Error getting reliability score: {e}\nResponse body: {body}")
-            self.article['reliability_score'] = -1
+            return -1
 
 
-    def __get_similar_articles(self):
+    def __get_similar_articles(self, main_article, similar_articles):
         """
-        Get similar articles from Google Custom Search API using the article title.
+        Get similar articles from the Google Custom Search results for the article title.
         Extracts full content from URLs to calculate accurate similarity scores.
         But uses Google-provided titles for display to avoid unnecessary parsing.
         """
-        print("[DEBUG] ArticleAnalyzer: Starting similar articles retrieval using title:", self.article.get('title', ''))
-        similar_articles = self.__search(self.article.get('title', ''))
         print("[DEBUG] ArticleAnalyzer: Google Custom Search returned", len(similar_articles), "results.")
 
         # Extract the main article's domain for comparison
-        main_article_domain = normalize_domain(self.article['url'])
+        main_article_domain = normalize_domain(main_article['url'])
         print(f"[DEBUG] ArticleAnalyzer: Main article domain (normalized): {main_article_domain}")
 
         # Create a mapping of URLs to their Google-provided titles
         url_to_title_map = {}
         filtered_urls = []
 
-        for item in similar_articles:
-            if 'link' not in item:
-                continue
+        similar_articles = [item for item in similar_articles if 'link' in item]
+        result_domains = domain_names(item['link'] for item in similar_articles)
 
+        for item, current_domain in zip(similar_articles, result_domains):
             url = item['link']
             google_title = item.get('title', '')  # Store Google title
-            current_domain = normalize_domain(url)
 
             # Skip this URL if it's from the same domain as the main article
             if current_domain == main_article_domain:
@@ -707,11 +745,13 @@ class ArticleAnalyzer:
 
         print(f"[DEBUG] ArticleAnalyzer: Filtered from {len(similar_articles)} to {len(filtered_urls)} URLs after domain normalization.")
 
-        # Extract content from filtered URLs (in parallel)
+        # Extract content from filtered URLs (in parallel). Workers only use the
+        # lightweight requests path; browser fallbacks are batched below.
         extracted_articles = []
-        with concurrent.futures.ProcessPoolExecutor(max_workers=4) as executor:
+        browser_urls = []
+        with concurrent.futures.ProcessPoolExecutor(max_workers=4, mp_context=_extraction_context) as executor:
             future_to_url = {
-                executor.submit(_extract_article_hybrid, url, self.article): url
+                executor.submit(_extract_article_hybrid, url, False): url
                 for url in filtered_urls
             }
             for future in concurrent.futures.as_completed(future_to_url):
@@ -727,15 +767,41 @@ class ArticleAnalyzer:
                         extracted_articles.append(data)
                         print(f"[DEBUG] ArticleAnalyzer: Extraction successful for {url}")
                     else:
-                        print(f"[DEBUG] ArticleAnalyzer: No data extracted for {url}")
+                        browser_urls.append(url)
                 except Exception as e:
                     print(f"[DEBUG] ArticleAnalyzer: Error extracting {url}: {e}")
 
-        return extracted_articles
+        # One browser, many tabs for every URL the requests path couldn't read
+        if browser_urls:
+            print(f"[DEBUG] ArticleAnalyzer: Loading {len(browser_urls)} URLs in browser tabs")
+            browser_articles = _extract_similar_with_browser(browser_urls)
+            for url in browser_urls:
+                data = browser_articles.get(url)
+                if data:
+                    if url in url_to_title_map and url_to_title_map[url]:
+                        data['google_title'] = url_to_title_map[url]
+
+                    extracted_articles.append(data)
+                    print(f"[DEBUG] ArticleAnalyzer: Browser extraction successful for {url}")
+                else:
+                    print(f"[DEBUG] ArticleAnalyzer: No data extracted for {url}")
+
+        return _score_similar_articles(main_article, extracted_articles)
 
 
 
     def __search(self, query: str, num_results: int = 10):
+        search_cache = get_search_cache()
+        key = f"{self.cx}:{num_results}:{normalize_query(query)}"
+        try:
+            search_results = search_cache.get_or_fetch(key, lambda: self.__fetch_search(query, num_results))
+            print("[DEBUG] ArticleAnalyzer: Search cache:", search_cache.stats())
+            return search_results
+        except Exception as e:
+            print("[DEBUG] ArticleAnalyzer: Error during search:", e)
+            return []
+
+    def __fetch_search(self, query: str, num_results: int):
         print("[DEBUG] ArticleAnalyzer: Performing Google Custom Search with query:", query)
         url = "https://www.googleapis.com/customsearch/v1"
         params = {
@@ -744,31 +810,19 @@ class ArticleAnalyzer:
             "q": query,
             "num": num_results,
         }
-        try:
-            response = requests.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            search_response = response.json()
-            print("[DEBUG] ArticleAnalyzer: Raw search response:", search_response)
-            search_results = search_response.get("items", [])
-            print("[DEBUG] ArticleAnalyzer: Search API returned", len(search_results), "items.")
-            return search_results
-        except Exception as e:
-            print("[DEBUG] ArticleAnalyzer: Error during search:", e)
-            return []
+        response = get_http_client().get(url, params=params, timeout=10)
+        response.raise_for_status()
+        search_response = response.json()
+        print("[DEBUG] ArticleAnalyzer: Raw search response:", search_response)
+        search_results = search_response.get("items", [])
+        print("[DEBUG] ArticleAnalyzer: Search API returned", len(search_results), "items.")
+        return search_results
 
 
     def get_similar(self):
         """Return similar articles with accurate similarity scores and Google titles."""
         # Create a display-friendly version of similar articles with Google titles
-        display_articles = []
-        for article in self.extracted_articles:
-            display_article = {
-                'url': article['url'],
-                # Use Google title if available, otherwise fallback to extracted title
-                'title': article.get('google_title', article.get('title', 'Untitled Article')),
-                'similarity_score': article.get('similarity_score', 0.5)
-            }
-            display_articles.append(display_article)
+        display_articles = [_display_article(article) for article in self.extracted_articles]
 
         # Sort by similarity score (highest first)
         display_articles.sort(key=lambda x: x.get('similarity_score', 0), reverse=True)
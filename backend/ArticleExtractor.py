@@ -1,46 +1,125 @@
 import re
-import json
+import os
 import random
 import time
 from typing import Optional, List, Dict
-from datetime import datetime
-from bs4 import BeautifulSoup
 import undetected_chromedriver as uc
 from urllib.parse import urljoin, urlparse
 import requests
 
+import date_extraction
+from content_scoring import find_text_rich_node
+from html_parsing import make_soup
+from url_normalization import find_canonical_url
+
+
+# Resources that never contribute to the article text
+BLOCKED_RESOURCE_PATTERNS = [
+    '*.png*', '*.jpg*', '*.jpeg*', '*.gif*', '*.webp*', '*.avif*', '*.svg*', '*.ico*',
+    '*.woff*', '*.ttf*', '*.otf*', '*.eot*',
+    '*.mp4*', '*.webm*', '*.mp3*', '*.m3u8*', '*.ts?*',
+]
+
+# Ad, analytics and tracking hosts
+BLOCKED_HOST_PATTERNS = [
+    '*doubleclick.net*', '*googlesyndication.com*', '*googleadservices.com*',
+    '*google-analytics.com*', '*googletagmanager.com*', '*googletagservices.com*',
+    '*adservice.google.*', '*amazon-adsystem.com*', '*facebook.net*', '*connect.facebook.*',
+    '*scorecardresearch.com*', '*quantserve.com*', '*chartbeat.com*', '*chartbeat.net*',
+    '*taboola.com*', '*outbrain.com*', '*criteo.com*', '*criteo.net*', '*hotjar.com*',
+    '*adnxs.com*', '*rubiconproject.com*', '*pubmatic.com*', '*moatads.com*',
+]
+
+# "text-only" blocks heavy resources and returns once the DOM is ready;
+# "full" loads everything and waits for the load event.
+LOAD_PROFILES = {
+    'text-only': {
+        'blocked_urls': BLOCKED_RESOURCE_PATTERNS + BLOCKED_HOST_PATTERNS,
+        'ready_states': ('interactive', 'complete'),
+        'stop_when_ready': True,
+    },
+    'full': {
+        'blocked_urls': [],
+        'ready_states': ('complete',),
+        'stop_when_ready': False,
+    },
+}
+
+
+def _parse_profile_overrides(value):
+    """Parse LOAD_PROFILE_OVERRIDES, e.g. "example.com=full,news.example.org=text-only"."""
+    overrides = {}
+    for item in (value or '').split(','):
+        domain, _, profile = item.partition('=')
+        domain, profile = domain.strip().lower(), profile.strip()
+        if domain and profile in LOAD_PROFILES:
+            overrides[domain] = profile
+    return overrides
+
+
+DEFAULT_LOAD_PROFILE = os.getenv('LOAD_PROFILE', 'text-only')
+DOMAIN_LOAD_PROFILES = _parse_profile_overrides(os.getenv('LOAD_PROFILE_OVERRIDES'))
+
+
+def get_load_profile(url):
+    """Return the load profile name for a URL, honoring per-domain overrides."""
+    host = (urlparse(url).hostname or '').lower()
+    parts = host.split('.')
+    # Most specific match wins: news.example.com, then example.com, then com
+    for i in range(len(parts)):
+        profile = DOMAIN_LOAD_PROFILES.get('.'.join(parts[i:]))
+        if profile:
+            return profile
+    return DEFAULT_LOAD_PROFILE if DEFAULT_LOAD_PROFILE in LOAD_PROFILES else 'full'
+
+
+def create_driver(use_proxy=False, proxy=None):
+    """
+    Launch a configured undetected Chrome driver.
+
+    Returns:
+        uc.Chrome or None: The driver, or None if Chrome failed to start
+    """
+    options = uc.ChromeOptions()
+    # Essential configuration
+    options.add_argument('--disable-blink-features=AutomationControlled')
+    options.add_argument('--start-maximized')
+    options.add_argument('--disable-popup-blocking')
+
+    # Set a custom user agent to help bypass anti-bot measures
+    options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+                         "AppleWebKit/537.36 (KHTML, like Gecko) "
+                         "Chrome/112.0.0.0 Safari/537.36")
+
+    if use_proxy and proxy:
+        options.add_argument(f'--proxy-server={proxy}')
+
+    options.add_argument('--disable-blink-features')
+    options.add_argument('--disable-notifications')
+    options.add_argument(f'--window-size={random.randint(1050, 1920)},{random.randint(800, 1080)}')
+    options.add_argument('--accept-lang=en-US,en')
+    options.add_argument('--disable-web-security')
+    options.add_argument('--allow-running-insecure-content')
+
+    # Return from navigation at DOMContentLoaded; profiles that need the full
+    # load event wait for it explicitly (see ArticleExtractor._wait_for_load).
+    options.page_load_strategy = 'eager'
+
+    # Initialize driver safely and increase page load timeout
+    try:
+        driver = uc.Chrome(options=options)
+        driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+        driver.set_page_load_timeout(60)  # Increased timeout
+        return driver
+    except Exception as e:
+        print(f"Error initializing the Chrome driver: {e}")
+        return None
+
 
 class ArticleExtractor:
-    def __init__(self, use_proxy=False, proxy=None):
-        options = uc.ChromeOptions()
-        # Essential configuration
-        options.add_argument('--disable-blink-features=AutomationControlled')
-        options.add_argument('--start-maximized')
-        options.add_argument('--disable-popup-blocking')
-
-        # Set a custom user agent to help bypass anti-bot measures
-        options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                             "AppleWebKit/537.36 (KHTML, like Gecko) "
-                             "Chrome/112.0.0.0 Safari/537.36")
-
-        if use_proxy and proxy:
-            options.add_argument(f'--proxy-server={proxy}')
-
-        options.add_argument('--disable-blink-features')
-        options.add_argument('--disable-notifications')
-        options.add_argument(f'--window-size={random.randint(1050, 1920)},{random.randint(800, 1080)}')
-        options.add_argument('--accept-lang=en-US,en')
-        options.add_argument('--disable-web-security')
-        options.add_argument('--allow-running-insecure-content')
-
-        # Initialize driver safely and increase page load timeout
-        self.driver = None
-        try:
-            self.driver = uc.Chrome(options=options)
-            self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-            self.driver.set_page_load_timeout(60)  # Increased timeout
-        except Exception as e:
-            print(f"Error initializing the Chrome driver: {e}")
+    def __init__(self, use_proxy=False, proxy=None, driver=None):
+        # Reuse a leased driver (see driver_pool) or launch a dedicated one
+        self.driver = driver if driver is not None else create_driver(use_proxy, proxy)
 
     def normalize_url(self, url, base_url):
         if not url:
@@ -63,11 +142,15 @@ class ArticleExtractor:
         except Exception as e:
             print(f"Error deleting cookies: {e}")
 
+        profile = self._apply_load_profile(url)
+        started = time.monotonic()
+
         # Retry mechanism for loading the page (explicit wait removed)
         max_retries = 2
         for attempt in range(max_retries):
             try:
                 self.driver.get(url)
+                self._wait_for_load(profile)
                 break  # Exit loop if successful
             except Exception as e:
                 print(f"Error loading page (attempt {attempt + 1}/{max_retries}): {e}")
@@ -84,18 +167,141 @@ class ArticleExtractor:
                     print(f"Error deleting cookies on retry: {e}")
                 time.sleep(1)  # brief pause before retrying
 
+        print(f"[DEBUG] ArticleExtractor: Loaded {url} with '{profile}' profile "
+              f"in {time.monotonic() - started:.2f}s")
+
         try:
             self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight/2);")
         except Exception as e:
             print(f"Error executing scroll script: {e}")
 
-        soup = BeautifulSoup(self.driver.page_source, 'html.parser')
+        return self.parse_article(self.driver.page_source, url)
+
+    def extract_articles(self, urls, max_tabs=10):
+        """
+        Load several URLs in parallel browser tabs of the same Chrome instance.
+
+        Tabs are opened in batches of `max_tabs` so every page in a batch loads
+        concurrently, then each tab is read and closed in turn.
+
+        Returns:
+            List[Dict]: One article dict per URL, in the same order as `urls`
+        """
+        if not self.driver:
+            return [{
+                'title': '',
+                'content': 'Could not initialize driver.',
+                'date': None,
+                'url': url,
+            } for url in urls]
+
+        try:
+            self.driver.delete_all_cookies()
+        except Exception as e:
+            print(f"Error deleting cookies: {e}")
+
+        results = {}
+        for start in range(0, len(urls), max_tabs):
+            batch = urls[start:start + max_tabs]
+            try:
+                main_handle = self.driver.current_window_handle
+                known_handles = set(self.driver.window_handles)
+            except Exception as e:
+                print(f"Error reading browser windows: {e}")
+                break
+
+            # Open every tab first so the pages load concurrently. Each tab
+            # starts blank so its load profile is in place before navigating.
+            tabs = []
+            started = time.monotonic()
+            for url in batch:
+                try:
+                    self.driver.switch_to.window(main_handle)
+                    self.driver.execute_script("window.open('about:blank', '_blank');")
+                    new_handles = set(self.driver.window_handles) - known_handles
+                    if not new_handles:
+                        continue
+                    handle = new_handles.pop()
+                    known_handles.add(handle)
+                    self.driver.switch_to.window(handle)
+                    profile = self._apply_load_profile(url)
+                    self.driver.execute_script("window.location.href = arguments[0];", url)
+                    tabs.append((handle, url, profile))
+                except Exception as e:
+                    print(f"Error opening tab for {url}: {e}")
+
+            for handle, url, profile in tabs:
+                switched = False
+                try:
+                    self.driver.switch_to.window(handle)
+                    switched = True
+                    self._wait_for_load(profile)
+                    print(f"[DEBUG] ArticleExtractor: Loaded {url} with '{profile}' profile "
+                          f"in {time.monotonic() - started:.2f}s")
+                    self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight/2);")
+                    results[url] = self.parse_article(self.driver.page_source, url)
+                except Exception as e:
+                    print(f"Error reading tab for {url}: {e}")
+                finally:
+                    # close() acts on the current window, so only close the tab we switched to
+                    if switched:
+                        try:
+                            self.driver.close()
+                        except Exception as e:
+                            print(f"Error closing tab for {url}: {e}")
+
+            try:
+                self.driver.switch_to.window(main_handle)
+            except Exception as e:
+                print(f"Error switching back to main tab: {e}")
+                break
+
+        return [results.get(url) or {
+            'title': '',
+            'content': 'Page load error',
+            'date': None,
+            'url': url,
+        } for url in urls]
+
+    def _apply_load_profile(self, url):
+        """Configure request blocking in the current tab for the URL's load profile."""
+        profile = get_load_profile(url)
+        try:
+            self.driver.execute_cdp_cmd('Network.enable', {})
+            self.driver.execute_cdp_cmd('Network.setBlockedURLs',
+                                        {'urls': LOAD_PROFILES[profile]['blocked_urls']})
+        except Exception as e:
+            print(f"Error applying '{profile}' load profile: {e}")
+        return profile
+
+    def _wait_for_load(self, profile):
+        """Wait until the page reaches the ready state the profile needs."""
+        ready_states = LOAD_PROFILES[profile]['ready_states']
+        deadline = time.monotonic() + 60
+        while time.monotonic() < deadline:
+            try:
+                if self.driver.execute_script("return document.readyState;") in ready_states:
+                    break
+            except Exception as e:
+                print(f"Error reading document ready state: {e}")
+                break
+            time.sleep(0.1)
+
+        if LOAD_PROFILES[profile]['stop_when_ready']:
+            # Everything we read is in the DOM already; stop late scripts and media
+            try:
+                self.driver.execute_script("window.stop();")
+            except Exception as e:
+                print(f"Error stopping page load: {e}")
+
+    def parse_article(self, html, url):
+        soup = make_soup(html)
 
         # Use the enhanced methods first, with fallback to original heuristics
         title = self.find_enhanced_title(soup) or self.find_title(soup)
         content_element = self.find_enhanced_content(soup) or self.find_main_content(soup)
         content = self.clean_content(content_element) if content_element else ''
-        date = self.find_date(soup)
+        date = self.find_date(soup, urlparse(url).hostname)
 
         if not content or len(content) < 100:
             content = "Could not extract meaningful content"
@@ -105,6 +311,7 @@ class ArticleExtractor:
             'content': content,
             'date': date,
             'url': url,
+            'canonical_url': find_canonical_url(soup, url),
         }
 
     def find_enhanced_title(self, soup):
@@ -147,10 +354,9 @@ class ArticleExtractor:
                 print(f"Error using enhanced selector {tag} with attrs {attrs}: {e}")
 
         try:
-            divs = soup.find_all("div")
-            text_rich_divs = [div for div in divs if len(div.get_text(strip=True)) > 300]
-            if text_rich_divs:
-                candidate = max(text_rich_divs, key=lambda d: len(d.get_text(strip=True)))
+            # One bottom-up pass instead of get_text() on every nested div
+            candidate = find_text_rich_node(soup, "div", min_length=300)
+            if candidate:
                 return candidate
         except Exception as e:
             print(f"Error finding text-rich div: {e}")
@@ -176,10 +382,9 @@ class ArticleExtractor:
                 continue
 
         try:
-            divs = soup.find_all("div")
-            text_rich_divs = [div for div in divs if len(div.get_text(strip=True)) > 300]
-            if text_rich_divs:
-                candidate = max(text_rich_divs, key=lambda d: len(d.get_text(strip=True)))
+            # One bottom-up pass instead of get_text() on every nested div
+            candidate = find_text_rich_node(soup, "div", min_length=300)
+            if candidate:
                 return candidate
         except Exception as e:
             print(f"Error finding text-rich div: {e}")
@@ -196,91 +401,11 @@ class ArticleExtractor:
 
         return soup.body
 
-    def find_date(self, soup) -> Optional[str]:
-        date_patterns = [
-            r'\d{4}-\d{2}-\d{2}',
-            r'\d{1,2}\s+(?:January|February|March|April|May|June|July|August|September|October|November|December)\s+\d{4}',
-            r'(?:January|February|March|April|May|June|July|August|September|October|November|December)\s+\d{1,2},?\s+\d{4}',
-            r'\d{1,2}/\d{1,2}/\d{4}',
-            r'(\d+)\s*(weeks?|months?|years?)\s+ago',
-            r'half\s+an?\s+(hour|day)\s+ago',
-            r'a\s+few\s+(minutes|hours|days|weeks)\s+ago',
-            r'yesterday'
-        ]
-
-        for meta_property in [
-            'article:published_time',
-            'og:published_time',
-            'publication_date',
-            'date',
-            'datePublished',
-            'publish_date'
-        ]:
-            try:
-                meta = (soup.find('meta', property=meta_property)
-                        or soup.find('meta', attrs={'name': meta_property}))
-                if meta and meta.get('content'):
-                    date_str = meta['content'].split('T')[0]
-                    standardized = self.standardize_date(date_str)
-                    if standardized:
-                        return standardized
-            except Exception as e:
-                print(f"Error parsing meta date ({meta_property}): {e}")
-
-        script_tags = soup.find_all('script', type='application/ld+json')
-        for script in script_tags:
-            try:
-                data = json.loads(script.string)
-                if isinstance(data, dict):
-                    date = data.get('datePublished') or data.get('dateCreated')
-                    if date:
-                        standardized = self.standardize_date(date.split('T')[0])
-                        if standardized:
-                            return standardized
-            except Exception as e:
-                print(f"Error parsing JSON-LD date: {e}")
-
-        try:
-            time_tag = soup.find('time')
-            if time_tag:
-                datetime_attr = time_tag.get('datetime') or time_tag.get('content')
-                if datetime_attr:
-                    standardized = self.standardize_date(datetime_attr.split('T')[0])
-                    if standardized:
-                        return standardized
-        except Exception as e:
-            print(f"Error parsing time tag: {e}")
+    def find_date(self, soup, domain=None) -> Optional[str]:
+        return date_extraction.find_date(soup, domain)
 
-        for pattern in date_patterns:
-            try:
-                date_match = re.search(pattern, str(soup))
-                if date_match:
-                    standardized = self.standardize_date(date_match.group())
-                    if standardized:
-                        return standardized
-            except Exception as e:
-                print(f"Error matching date pattern '{pattern}': {e}")
-
-        return None
-
-    def standardize_date(self, date_str: str) -> Optional[str]:
-        date_formats = [
-            '%Y-%m-%d',
-            '%B %d, %Y',
-            '%d %B %Y',
-            '%m/%d/%Y',
-            '%d/%m/%Y',
-            '%Y/%m/%d',
-        ]
-        date_str = date_str.strip()
-        for fmt in date_formats:
-            try:
-                parsed_date = datetime.strptime(date_str, fmt)
-                return parsed_date.strftime('%Y-%m-%d')
-            except ValueError:
-                continue
-        print(f"Could not parse date: {date_str}")
-        return None
+    def standardize_date(self, date_str: str, domain=None) -> Optional[str]:
+        return date_extraction.standardize_date(date_str, domain)
 
     def find_title(self, soup):
         for title_finder in [
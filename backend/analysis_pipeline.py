@@ -0,0 +1,242 @@
+import concurrent.futures
+import copy
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Sequence
+
+
+class Stage:
+    """
+    One named step of an analysis pipeline.
+
+    Args:
+        name (str): Key the stage's result is stored under
+        func (callable): Called with the results dict; returns the stage's result
+        requires (sequence): Names of stages whose results func reads
+        cache_key (callable): Maps the results dict to a cache key, or None
+            for stages that are never cached
+        cacheable (callable): Decides whether a result may be cached, e.g.
+            to skip results built from fallback values; by default any
+            non-empty result is
+        threaded (bool): Run in a worker thread. Stages that need the caller's
+            context (e.g. a Flask app context for database access) set this
+            to False and run in the calling thread.
+    """
+
+    def __init__(self, name: str, func: Callable[[dict], object], requires: Sequence[str] = (),
+                 cache_key: Optional[Callable[[dict], str]] = None, threaded: bool = True,
+                 cacheable: Callable[[object], bool] = bool):
+        self.name = name
+        self.func = func
+        self.requires = tuple(requires)
+        self.cache_key = cache_key
+        self.cacheable = cacheable
+        self.threaded = threaded
+
+
+class StageCache:
+    """
+    In-memory LRU of stage results with a time-to-live.
+
+    Results are deep-copied in and out so callers can mutate what they get
+    without touching the cached copy.
+    """
+
+    def __init__(self, max_size=256, ttl=3600):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, stage: str, key: str):
+        with self._lock:
+            entry = self._entries.get((stage, key))
+            if entry is None:
+                return None
+            stored_at, value = entry
+            if time.monotonic() - stored_at > self.ttl:
+                del self._entries[(stage, key)]
+                return None
+            self._entries.move_to_end((stage, key))
+        return copy.deepcopy(value)
+
+    def set(self, stage: str, key: str, value):
+        value = copy.deepcopy(value)
+        with self._lock:
+            self._entries[(stage, key)] = (time.monotonic(), value)
+            self._entries.move_to_end((stage, key))
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, stage: Optional[str] = None):
+        """Drop cached results for one stage, or for every stage."""
+        with self._lock:
+            if stage is None:
+                self._entries.clear()
+            else:
+                for entry_key in [k for k in self._entries if k[0] == stage]:
+                    del self._entries[entry_key]
+
+
+class PipelineRun:
+    """Results of one pipeline run with per-stage status and timing."""
+
+    def __init__(self, results: dict, on_stage=None):
+        self.results = results
+        self.on_stage = on_stage
+        # stage name -> "done" (already in results), "cached" or "ran"
+        self.status: Dict[str, str] = {}
+        # stage name -> seconds spent running it
+        self.timings: Dict[str, float] = {}
+
+    def notify(self, name: str):
+        if self.on_stage is None:
+            return
+        try:
+            self.on_stage(name, self.results[name])
+        except Exception as e:
+            # A broken listener must not fail the analysis
+            print(f"[DEBUG] Pipeline: on_stage callback failed for {name}: {e}")
+
+    def summary(self) -> str:
+        return ", ".join(f"{name}={self.status[name]}"
+                         + (f" {self.timings[name]:.2f}s" if name in self.timings else "")
+                         for name in self.status)
+
+
+class Pipeline:
+    """
+    Runs stages in dependency order, each as soon as its requirements are met.
+
+    Stages whose requirements are all satisfied run concurrently. A stage is
+    skipped if its result was passed in up front or is in the cache, so only
+    the missing parts of an analysis are recomputed. An exception from any
+    stage stops the run and is re-raised.
+
+    Args:
+        stages (list): Stages in any order; names must be unique
+        cache (StageCache): Cache for stages that define a cache_key
+        max_workers (int): Threads for concurrent stages
+    """
+
+    def __init__(self, stages: Sequence[Stage], cache: Optional[StageCache] = None, max_workers=4):
+        self.stages = {stage.name: stage for stage in stages}
+        self.cache = cache
+        self.max_workers = max_workers
+        for stage in stages:
+            missing = [name for name in stage.requires if name not in self.stages]
+            if missing:
+                raise ValueError(f"Stage '{stage.name}' requires unknown stage(s): {', '.join(missing)}")
+
+    def run(self, results: Optional[dict] = None,
+            on_stage: Optional[Callable[[str, object], None]] = None) -> PipelineRun:
+        """
+        Run every stage whose result isn't already known.
+
+        Args:
+            results (dict): Stage results that are already known, e.g. a cached
+                extraction; those stages are not run
+            on_stage (callable): Called as on_stage(name, result) on the calling
+                thread as soon as each stage's result is available, including
+                known and cached ones
+
+        Returns:
+            PipelineRun: All stage results plus status and timing per stage
+        """
+        run = PipelineRun(dict(results or {}), on_stage)
+        for name in self.stages:
+            if name in run.results:
+                run.status[name] = 'done'
+                run.notify(name)
+
+        pending = {name: stage for name, stage in self.stages.items() if name not in run.results}
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers)
+        running = {}
+        try:
+            while pending or running:
+                ready = [stage for stage in pending.values()
+                         if all(name in run.results for name in stage.requires)]
+                cached = False
+                for stage in ready:
+                    if self._load_cached(stage, run):
+                        del pending[stage.name]
+                        cached = True
+                    elif stage.threaded:
+                        del pending[stage.name]
+                        running[executor.submit(self._timed, stage, run.results)] = stage
+                if cached:
+                    # A cached result may have unblocked more stages
+                    continue
+
+                # Inline stages run in this thread while the threaded ones work
+                inline = [stage for stage in ready if stage.name in pending]
+                for stage in inline:
+                    del pending[stage.name]
+                    self._store(stage, run, self._timed(stage, run.results))
+                if inline:
+                    continue
+                if not running:
+                    if pending:
+                        raise RuntimeError(f"Pipeline stages can't run: {', '.join(pending)}")
+                    break
+
+                done, _ = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    stage = running.pop(future)
+                    self._store(stage, run, future.result())
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        print(f"[DEBUG] Pipeline: {run.summary()}")
+        return run
+
+    def _load_cached(self, stage: Stage, run: PipelineRun) -> bool:
+        if self.cache is None or stage.cache_key is None:
+            return False
+        key = stage.cache_key(run.results)
+        value = self.cache.get(stage.name, key) if key else None
+        if value is None:
+            return False
+        run.results[stage.name] = value
+        run.status[stage.name] = 'cached'
+        run.notify(stage.name)
+        return True
+
+    def _store(self, stage: Stage, run: PipelineRun, timed_result):
+        elapsed, value = timed_result
+        run.results[stage.name] = value
+        run.status[stage.name] = 'ran'
+        run.timings[stage.name] = elapsed
+        run.notify(stage.name)
+        # Empty or failed results (failed searches, no similar articles) are worth retrying
+        if self.cache is not None and stage.cache_key is not None and stage.cacheable(value):
+            key = stage.cache_key(run.results)
+            if key:
+                self.cache.set(stage.name, key, value)
+
+    @staticmethod
+    def _timed(stage: Stage, results: dict):
+        started = time.perf_counter()
+        value = stage.func(results)
+        return time.perf_counter() - started, value
+
+
+_stage_cache = None
+_stage_cache_lock = threading.Lock()
+
+
+def get_stage_cache() -> StageCache:
+    """
+    Return the process-wide stage cache, sized by PIPELINE_CACHE_SIZE entries
+    with a PIPELINE_CACHE_TTL (seconds) lifetime.
+    """
+    global _stage_cache
+    with _stage_cache_lock:
+        if _stage_cache is None:
+            _stage_cache = StageCache(
+                max_size=int(os.getenv('PIPELINE_CACHE_SIZE', 256)),
+                ttl=float(os.getenv('PIPELINE_CACHE_TTL', 3600)),
+            )
+        return _stage_cache
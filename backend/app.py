@@ -3,8 +3,10 @@ import hashlib
 import hmac
 import json
 import os
+import queue
 import random
 import string
+import threading
 from datetime import datetime, timedelta
 from functools import wraps
 
@@ -12,17 +14,21 @@ import iyzipay
 import jwt
 import requests
 from dotenv import load_dotenv
-from flask import Flask, request, jsonify, current_app, redirect
+from flask import Flask, Response, request, jsonify, current_app, redirect
 from flask import url_for
 from flask_cors import CORS
 from flask_mail import Mail, Message
 from itsdangerous import URLSafeTimedSerializer
-from sqlalchemy import func
+from sqlalchemy import func, tuple_
 
-from ArticleAnalyzer import ArticleAnalyzer, validate_article_data
+from ArticleAnalyzer import ArticleAnalyzer, extract_main_article, validate_article_data
 from email_verification.TOTPVerification import TOTPVerification
-from models import db, User, ArticleSearch, SimilarArticle, ArticleRequest
-from website_checker import check_website_score
+from job_queue import JobQueue
+from models import db, User, ArticleSearch, SimilarArticle, ArticleRequest, AnalysisJob, UserDailyStats
+from principal_cache import Principal, principal_cache
+from single_flight import single_flight
+from url_normalization import canonicalize_url
+from website_checker import check_website_score, trusted_websites
 
 PLAN_PRICES = {
     'premium': '49.99',
@@ -106,6 +112,13 @@ def create_app():
 
 
 app = create_app()
+
+# Load trusted_websites up front so the first credibility check doesn't wait on it
+with app.app_context():
+    try:
+        trusted_websites.refresh()
+    except Exception as e:
+        print(f"[DEBUG] Could not preload trusted websites, will retry on first use: {e}")
 verifier = TOTPVerification(app.config['EMAIL_VERIFICATION_SECRET_KEY'])
 
 
@@ -118,6 +131,33 @@ def iyzi_options():
     }
 
 
+def _token_user_id():
+    """
+    Read the user id from the request's bearer token.
+
+    Returns:
+        tuple: (user_id, None), or (None, error response) if the token is
+        missing or invalid
+    """
+    token = None
+    # Attempt to retrieve the token from the Authorization header
+    if 'Authorization' in request.headers:
+        auth_header = request.headers['Authorization']
+        parts = auth_header.split()
+        if len(parts) == 2 and parts[0].lower() == 'bearer':
+            token = parts[1]
+    if not token:
+        return None, (jsonify({'error': 'Token is missing!'}), 401)
+    try:
+        # Decode the token using the app's secret key and HS256 algorithm
+        data = jwt.decode(token, current_app.config['JWT_SECRET_KEY'], algorithms=["HS256"])
+        return data['user_id'], None
+    except jwt.ExpiredSignatureError:
+        return None, (jsonify({'error': 'Token has expired!'}), 401)
+    except jwt.InvalidTokenError:
+        return None, (jsonify({'error': 'Invalid token!'}), 401)
+
+
 def token_required(f):
     """
     Decorator to protect endpoints with JWT authentication.
@@ -126,25 +166,13 @@ def token_required(f):
 
     @wraps(f)
     def decorated(*args, **kwargs):
-        token = None
-        # Attempt to retrieve the token from the Authorization header
-        if 'Authorization' in request.headers:
-            auth_header = request.headers['Authorization']
-            parts = auth_header.split()
-            if len(parts) == 2 and parts[0].lower() == 'bearer':
-                token = parts[1]
-        if not token:
-            return jsonify({'error': 'Token is missing!'}), 401
-        try:
-            # Decode the token using the app's secret key and HS256 algorithm
-            data = jwt.decode(token, current_app.config['JWT_SECRET_KEY'], algorithms=["HS256"])
-            current_user = User.query.get(data['user_id'])
-            if not current_user:
-                return jsonify({'error': 'User not found!'}), 401
-        except jwt.ExpiredSignatureError:
-            return jsonify({'error': 'Token has expired!'}), 401
-        except jwt.InvalidTokenError:
-            return jsonify({'error': 'Invalid token!'}), 401
+        user_id, error = _token_user_id()
+        if error:
+            return error
+        current_user = User.query.get(user_id)
+        if not current_user:
+            return jsonify({'error': 'User not found!'}), 401
+        principal_cache.put(Principal.from_user(current_user))
 
         # Pass the current_user to the wrapped route function
         return f(current_user, *args, **kwargs)
@@ -152,9 +180,235 @@ def token_required(f):
     return decorated
 
 
+def principal_required(f):
+    """
+    Like token_required, but passes a cached Principal (id, email, plan,
+    verification status) instead of the User row, so most calls skip the
+    database. For endpoints that only read those fields.
+    """
+
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        user_id, error = _token_user_id()
+        if error:
+            return error
+        principal = principal_cache.resolve(user_id)
+        if principal is None:
+            return jsonify({'error': 'User not found!'}), 401
+        return f(principal, *args, **kwargs)
+
+    return decorated
+
+
+def _stored_analysis(current_user, url, past_article, website_credibility):
+    """Response for an already analyzed article, linking it to the user's requests."""
+    print("[DEBUG] run_analysis: Found past article with ID:", past_article.id)
+    past_similar_articles = SimilarArticle.query.filter_by(main_article_id=past_article.id).all()
+    print("[DEBUG] run_analysis: Found", len(past_similar_articles), "similar articles from database")
+
+    article_data = {
+        'url': past_article.url,
+        'title': past_article.title
+    }
+
+    similar_articles_data = [{
+        'url': article.url,
+        'title': article.title,
+        'similarity_score': article.similarity_score
+    } for article in past_similar_articles]
+
+    print("crocodilo bombardino")
+
+    past_request = ArticleRequest.query.filter_by(user_id=current_user.id, article_id=past_article.id).first()
+    if not past_request:
+        article_request = ArticleRequest(
+            user_id=current_user.id,
+            article_id=past_article.id
+        )
+        db.session.add(article_request)
+        db.session.commit()
+
+    return {
+        'reliability_score': past_article.reliability_score,
+        'message': f"Results for {url}",
+        'article': article_data,
+        'similar_articles': similar_articles_data,
+        'website_credibility': website_credibility['credibility_score'],
+        'article_id': past_article.id,
+        'objectivity_score': past_article.objectivity_score,
+        'title_objectivity_score': past_article.title_objectivity,
+        'bias_prediction': past_article.bias_prediction,
+        'bias_probabilities': past_article.bias_probabilities,
+        'spelling_issues': past_article.spelling_issues,
+        'linguistic_issues': past_article.linguistic_issues,
+        'pct': past_article.pct,
+    }, 200
+
+
+def run_analysis(current_user, url, on_progress=None):
+    """
+    Analyze an article for a user, reusing a stored analysis of the same URL.
+
+    Shared by the /scrap_and_search endpoints and background analysis jobs.
+    Database changes are committed on success; callers roll back on exceptions.
+    on_progress(event, data) receives partial results of a new analysis (see
+    ArticleAnalyzer).
+
+    Returns:
+        tuple: (response body dict, HTTP status code)
+    """
+    website_credibility = check_website_score(url)
+    print("[DEBUG] run_analysis: Website credibility score:", website_credibility['credibility_score'])
+
+    # Tracking parameters, AMP/mobile variants etc. share one stored analysis
+    canonical_url = canonicalize_url(url)
+    past_article = ArticleSearch.query.filter_by(canonical_url=canonical_url).first()
+    if past_article:
+        return _stored_analysis(current_user, url, past_article, website_credibility)
+
+    # Concurrent requests for the same URL wait here for a single analysis.
+    # End the transaction first so waiting doesn't hold a pooled connection.
+    db.session.commit()
+    with single_flight(f"analysis:{canonical_url}"):
+        # Another request may have stored it while this one was waiting
+        past_article = ArticleSearch.query.filter_by(canonical_url=canonical_url).first()
+        if past_article:
+            print("[DEBUG] run_analysis: Joined in-flight analysis of", url)
+            return _stored_analysis(current_user, url, past_article, website_credibility)
+
+        main_article, error = _extract_new_article(url)
+        if error:
+            return error
+
+        page_canonical_url = canonical_url
+        if main_article.get('canonical_url'):
+            page_canonical_url = canonicalize_url(main_article['canonical_url'])
+        if page_canonical_url == canonical_url:
+            return _store_new_analysis(current_user, url, canonical_url, main_article, website_credibility,
+                                       on_progress)
+
+    # The page names another canonical URL, which other variants of it lock on
+    # too. Its lock is only taken after releasing the request URL's, so two
+    # pages naming each other as canonical can't deadlock.
+    db.session.commit()
+    with single_flight(f"analysis:{page_canonical_url}"):
+        past_article = ArticleSearch.query.filter_by(canonical_url=page_canonical_url).first()
+        if past_article:
+            print("[DEBUG] run_analysis: Found past article under page's canonical URL", page_canonical_url)
+            return _stored_analysis(current_user, url, past_article, website_credibility)
+        return _store_new_analysis(current_user, url, page_canonical_url, main_article, website_credibility,
+                                   on_progress)
+
+
+def _extract_new_article(url):
+    """Extract an article nobody has requested before; (article, None) or (None, error response)."""
+    print(f"[DEBUG] run_analysis: No past article found. Proceeding to extract new article for URL: {url}")
+    try:
+        return extract_main_article(url), None
+    except Exception as e:
+        print("[DEBUG] run_analysis: Exception during article extraction:", e)
+        return None, ({'error': str(e)}, 400)
+
+
+def _store_new_analysis(current_user, url, canonical_url, main_article, website_credibility, on_progress=None):
+    """Run the full analysis of an extracted article and store it under `canonical_url`."""
+    cred_score = website_credibility.get('credibility_score')
+    if cred_score is None:
+        cred_score = 1
+
+    try:
+        google_search = ArticleAnalyzer(
+            app.config['G_API_KEY'],
+            app.config['CX_ID'],
+            url,
+            known_results={'extract': main_article},
+            on_progress=on_progress
+        )
+        if not validate_article_data(google_search.article):
+            print("[DEBUG] run_analysis: Article validation failed")
+            return {'error': f"Could not extract meaningful content from {url}"}, 400
+
+        # Get similar articles with Google-provided titles
+        similar_articles = google_search.get_similar()
+        article = google_search.article
+        print("[DEBUG] run_analysis: Article extracted successfully.")
+    except Exception as e:
+        print("[DEBUG] run_analysis: Exception during article analysis:", e)
+        return {'error': str(e)}, 400
+
+    print("article : ", article)
+
+    new_search = ArticleSearch(
+        url=article['url'],
+        canonical_url=canonical_url[:500],
+        title=article['title'],
+        reliability_score=article.get('reliability_score', -1),
+        credibility_score=cred_score,
+        objectivity_score=article.get('objectivity_score', -1),
+        bias_prediction=article.get('bias_prediction', -1),
+        bias_probabilities=article.get('bias_probabilities', -1),
+        title_objectivity=article.get('title_objectivity_score', -1),
+        linguistic_issues=article.get('linguistic_issues', -1),
+        spelling_issues=article.get('spelling_issues', -1),
+        pct=article.get('pct', -1)
+    )
+
+    db.session.add(new_search)
+    db.session.flush()
+
+    article_request = ArticleRequest(
+        user_id=current_user.id,
+        article_id=new_search.id
+    )
+
+    db.session.add(article_request)
+
+    # Store similar articles with Google-provided titles
+    similar_articles_to_insert = []
+    for sim in similar_articles:
+        # Use title directly from Google API (already in sim['title'])
+        safe_title = (sim.get('title') or '')[:500]
+        safe_url = (sim.get('url') or '')[:500]
+        sim_score = sim.get('similarity_score', 0.0)
+        similar_articles_to_insert.append(
+            SimilarArticle(
+                main_article_id=new_search.id,
+                title=safe_title,
+                url=safe_url,
+                similarity_score=sim_score
+            )
+        )
+
+    if similar_articles_to_insert:
+        db.session.bulk_save_objects(similar_articles_to_insert)
+
+    db.session.commit()
+    print("[DEBUG] run_analysis: Database commit successful. Similar articles count:", len(similar_articles))
+    print("objectivity for title: ", article.get('title_objectivity_score'))
+    return {
+        'reliability_score': article['reliability_score'],
+        'message': f"Results for {url}",
+        'article': article,
+        'similar_articles': similar_articles,
+        'website_credibility': cred_score,
+        'article_id': new_search.id,
+        'objectivity_score': article['objectivity_score'],
+        'bias_prediction': article['bias_prediction'],
+        'title_objectivity_score': article['title_objectivity_score'],
+        'bias_probabilities': article['bias_probabilities'],
+        'spelling_issues': article['spelling_issues'],
+        'linguistic_issues': article['linguistic_issues'],
+        'pct': article['pct'],
+    }, 200
+
+
 @app.route('/scrap_and_search', methods=['POST'])
 @token_required
 def scrap_and_search(current_user):
+    """
+    Analyze an article. With {"async": true} in the body the analysis is queued
+    and a job id is returned right away; poll /jobs/<job_id> for the result.
+    """
     print("[DEBUG] scrap_and_search: Endpoint called for user:", current_user.email)
     try:
         data = request.json
@@ -164,143 +418,92 @@ def scrap_and_search(current_user):
             return jsonify({'error': 'URL parameter is required'}), 400
         print(f"[DEBUG] scrap_and_search: Processing URL: {url}")
 
-        website_credibility = check_website_score(url)
-        cred_score = website_credibility.get('credibility_score')
-        if cred_score is None:
-            cred_score = 1
-        print("[DEBUG] scrap_and_search: Website credibility score:", website_credibility['credibility_score'])
+        if data.get('async'):
+            job = job_queue.enqueue(current_user.id, url)
+            return jsonify({
+                'job_id': job.id,
+                'status': job.status,
+                'status_url': url_for('get_job', job_id=job.id),
+            }), 202
 
-        past_article = ArticleSearch.query.filter_by(url=url).first()
-        if past_article:
-            print("[DEBUG] scrap_and_search: Found past article with ID:", past_article.id)
-            past_similar_articles = SimilarArticle.query.filter_by(main_article_id=past_article.id).all()
-            print("[DEBUG] scrap_and_search: Found", len(past_similar_articles), "similar articles from database")
+        body, status = run_analysis(current_user, url)
+        return jsonify(body), status
 
-            article_data = {
-                'url': past_article.url,
-                'title': past_article.title
-            }
+    except Exception as e:
+        # Rollback any database changes if there was an error
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
 
-            similar_articles_data = [{
-                'url': article.url,
-                'title': article.title,
-                'similarity_score': article.similarity_score
-            } for article in past_similar_articles]
 
-            print("crocodilo bombardino")
+def _sse(event, data):
+    """Format one server-sent event."""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
 
-            past_request = ArticleRequest.query.filter_by(user_id=current_user.id, article_id=past_article.id).first()
-            if not past_request:
-                article_request = ArticleRequest(
-                    user_id=current_user.id,
-                    article_id=past_article.id
-                )
-                db.session.add(article_request)
-                db.session.commit()
 
-            return jsonify({
-                'reliability_score': past_article.reliability_score,
-                'message': f"Results for {url}",
-                'article': article_data,
-                'similar_articles': similar_articles_data,
-                'website_credibility': website_credibility['credibility_score'],
-                'article_id': past_article.id,
-                'objectivity_score': past_article.objectivity_score,
-                'title_objectivity_score': past_article.title_objectivity,
-                'bias_prediction': past_article.bias_prediction,
-                'bias_probabilities': past_article.bias_probabilities,
-                'spelling_issues': past_article.spelling_issues,
-                'linguistic_issues': past_article.linguistic_issues,
-                'pct': past_article.pct,
-            })
+@app.route('/scrap_and_search/stream', methods=['POST'])
+@token_required
+def scrap_and_search_stream(current_user):
+    """
+    Analyze an article and stream progress as server-sent events.
 
-        print(f"[DEBUG] scrap_and_search: No past article found. Proceeding to extract new article for URL: {url}")
-        try:
-            google_search = ArticleAnalyzer(
-                app.config['G_API_KEY'],
-                app.config['CX_ID'],
-                url
-            )
-            if not validate_article_data(google_search.article):
-                print("[DEBUG] scrap_and_search: Article validation failed")
-                return jsonify({'error': f"Could not extract meaningful content from {url}"}), 400
-
-            # Get similar articles with Google-provided titles
-            similar_articles = google_search.get_similar()
-            article = google_search.article
-            print("[DEBUG] scrap_and_search: Article extracted successfully.")
-        except Exception as e:
-            print("[DEBUG] scrap_and_search: Exception during article extraction:", e)
-            return jsonify({'error': str(e)}), 400
-
-        print("article : ", article)
-
-        new_search = ArticleSearch(
-            url=article['url'],
-            title=article['title'],
-            reliability_score=article.get('reliability_score', -1),
-            credibility_score=cred_score,
-            objectivity_score=article.get('objectivity_score', -1),
-            bias_prediction=article.get('bias_prediction', -1),
-            bias_probabilities=article.get('bias_probabilities', -1),
-            title_objectivity=article.get('title_objectivity_score', -1),
-            linguistic_issues=article.get('linguistic_issues', -1),
-            spelling_issues=article.get('spelling_issues', -1),
-            pct=article.get('pct', -1)
-        )
+    Partial results are pushed as each stage finishes (article, objectivity,
+    bias, spelling, credibility, similar_article, reliability). The last event
+    is "result", with the same body and status /scrap_and_search returns.
+    """
+    data = request.json or {}
+    url = data.get('url')
+    if not url:
+        return jsonify({'error': 'URL parameter is required'}), 400
+    print(f"[DEBUG] scrap_and_search_stream: Processing URL: {url}")
 
-        db.session.add(new_search)
-        db.session.flush()
+    events = queue.Queue()
+    user_id = current_user.id
 
-        article_request = ArticleRequest(
-            user_id=current_user.id,
-            article_id=new_search.id
-        )
+    def analyze():
+        with app.app_context():
+            try:
+                user = User.query.get(user_id)
+                body, status = run_analysis(user, url, on_progress=lambda event, payload: events.put((event, payload)))
+                events.put(('result', {'status': status, 'body': body}))
+            except Exception as e:
+                db.session.rollback()
+                events.put(('result', {'status': 500, 'body': {'error': str(e)}}))
+            finally:
+                db.session.remove()
 
-        db.session.add(article_request)
+    # The analysis keeps running (and is stored) even if the client disconnects
+    threading.Thread(target=analyze, name='analysis-stream', daemon=True).start()
 
-        # Store similar articles with Google-provided titles
-        similar_articles_to_insert = []
-        for sim in similar_articles:
-            # Use title directly from Google API (already in sim['title'])
-            safe_title = (sim.get('title') or '')[:500]
-            safe_url = (sim.get('url') or '')[:500]
-            sim_score = sim.get('similarity_score', 0.0)
-            similar_articles_to_insert.append(
-                SimilarArticle(
-                    main_article_id=new_search.id,
-                    title=safe_title,
-                    url=safe_url,
-                    similarity_score=sim_score
-                )
-            )
+    def generate():
+        while True:
+            try:
+                event, payload = events.get(timeout=15)
+            except queue.Empty:
+                # Comment line keeps proxies from closing an idle stream
+                yield ": keep-alive\n\n"
+                continue
+            yield _sse(event, payload)
+            if event == 'result':
+                return
 
-        if similar_articles_to_insert:
-            db.session.bulk_save_objects(similar_articles_to_insert)
+    return Response(generate(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
 
-        db.session.commit()
-        print("[DEBUG] scrap_and_search: Database commit successful. Similar articles count:", len(similar_articles))
-        print("objectivity for title: ", article.get('title_objectivity_score'))
-        return jsonify({
-            'reliability_score': article['reliability_score'],
-            'message': f"Results for {url}",
-            'article': article,
-            'similar_articles': similar_articles,
-            'website_credibility': cred_score,
-            'article_id': new_search.id,
-            'objectivity_score': article['objectivity_score'],
-            'bias_prediction': article['bias_prediction'],
-            'title_objectivity_score': article['title_objectivity_score'],
-            'bias_probabilities': article['bias_probabilities'],
-            'spelling_issues': article['spelling_issues'],
-            'linguistic_issues': article['linguistic_issues'],
-            'pct': article['pct'],
-        })
 
-    except Exception as e:
-        # Rollback any database changes if there was an error
-        db.session.rollback()
-        return jsonify({'error': str(e)}), 500
+job_queue = JobQueue(app, run_analysis, max_workers=int(os.getenv('ANALYSIS_WORKERS', 2)))
+if os.getenv('RESUME_QUEUED_JOBS', 'False').lower() == 'true':
+    # Pick up jobs a previous worker accepted but never started or never finished
+    job_queue.resume_queued()
+
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+@principal_required
+def get_job(current_user, job_id):
+    """Status of an analysis job, with its result once it has finished."""
+    job = AnalysisJob.query.filter_by(id=job_id, user_id=current_user.id).first()
+    if not job:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(job.to_dict())
 
 
 # --- Helper functions for token generation ---
@@ -495,34 +698,107 @@ def login_user():
         }), 500
 
 
+# Fields /user/searches can return, and the page size limits
+SEARCH_FIELDS = {
+    'url': ArticleSearch.url,
+    'title': ArticleSearch.title,
+    'reliability_score': ArticleSearch.reliability_score,
+    'credibility_score': ArticleSearch.credibility_score,
+    'objectivity_score': ArticleSearch.objectivity_score,
+    'bias_prediction': ArticleSearch.bias_prediction,
+    'bias_probabilities': ArticleSearch.bias_probabilities,
+    'created_at': ArticleSearch.created_at,
+    'id': ArticleSearch.id,
+}
+SEARCHES_PAGE_SIZE = 50
+SEARCHES_MAX_PAGE_SIZE = 200
+
+
+def _encode_cursor(requested_at, article_id):
+    raw = json.dumps([requested_at.isoformat(), article_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def _decode_cursor(cursor):
+    requested_at, article_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    return datetime.fromisoformat(requested_at), int(article_id)
+
+
 @app.route('/user/searches', methods=['GET'])
-@token_required
+@principal_required
 def get_user_searches(current_user):
     """
-    Endpoint to retrieve all searches performed by a specific user.
-    Returns a list of search results with their similar articles.
+    Endpoint to retrieve the searches performed by a specific user, newest first.
     This endpoint is protected and requires a valid JWT token.
+
+    Without `limit` or `cursor` the full history is returned, as existing
+    clients expect. Passing either pages the results by a cursor over
+    (request time, article id); pass the returned next_cursor back as
+    `cursor` for the next page. Optional query parameters:
+        limit            page size when paging (default 50, at most 200)
+        cursor           next_cursor from the previous page
+        fields           comma-separated subset of SEARCH_FIELDS
+        from, to         ISO dates/times bounding when the user requested it
+        bias             comma-separated bias_prediction labels
+        min_reliability, max_reliability
     """
     try:
-        searches = ArticleSearch.query.join(ArticleRequest) \
-            .filter(ArticleRequest.user_id == current_user.id) \
-            .all()
+        args = request.args
+        try:
+            limit = None
+            if 'limit' in args or 'cursor' in args:
+                limit = min(max(int(args.get('limit', SEARCHES_PAGE_SIZE)), 1), SEARCHES_MAX_PAGE_SIZE)
+            fields = args.get('fields', '').split(',') if args.get('fields') else list(SEARCH_FIELDS)
+            unknown = [field for field in fields if field not in SEARCH_FIELDS]
+            if unknown:
+                raise ValueError(f"Unknown field(s): {', '.join(unknown)}")
+
+            filters = [ArticleRequest.user_id == current_user.id]
+            if args.get('cursor'):
+                filters.append(tuple_(ArticleRequest.created_at, ArticleRequest.article_id)
+                               < tuple_(*_decode_cursor(args['cursor'])))
+            if args.get('from'):
+                filters.append(ArticleRequest.created_at >= datetime.fromisoformat(args['from']))
+            if args.get('to'):
+                filters.append(ArticleRequest.created_at <= datetime.fromisoformat(args['to']))
+            if args.get('bias'):
+                filters.append(ArticleSearch.bias_prediction.in_(args['bias'].split(',')))
+            if args.get('min_reliability'):
+                filters.append(ArticleSearch.reliability_score >= float(args['min_reliability']))
+            if args.get('max_reliability'):
+                filters.append(ArticleSearch.reliability_score <= float(args['max_reliability']))
+        except (ValueError, TypeError) as e:
+            return jsonify({'error': 'Invalid parameters', 'message': str(e)}), 400
+
+        # Walks ix_article_requests_user_id_created_at backwards; only the
+        # requested columns are loaded
+        query = db.session.query(
+            ArticleRequest.created_at.label('requested_at'),
+            ArticleRequest.article_id,
+            *[SEARCH_FIELDS[field].label(field) for field in fields]
+        ).join(
+            ArticleSearch, ArticleSearch.id == ArticleRequest.article_id
+        ).filter(
+            *filters
+        ).order_by(
+            ArticleRequest.created_at.desc(), ArticleRequest.article_id.desc()
+        )
 
-        articles_data = [{
-            'url': article.url,
-            'title': article.title,
-            'reliability_score': article.reliability_score,
-            'credibility_score': article.credibility_score,
-            'objectivity_score': article.objectivity_score,
-            'bias_prediction': article.bias_prediction,
-            'bias_probabilities': article.bias_probabilities,
-            'created_at': article.created_at,
-            'id': article.id,
-        } for article in searches]
+        next_cursor = None
+        if limit is None:
+            page = query.all()
+        else:
+            rows = query.limit(limit + 1).all()
+            page = rows[:limit]
+            if len(rows) > limit:
+                next_cursor = _encode_cursor(page[-1].requested_at, page[-1].article_id)
+
+        articles_data = [{field: getattr(row, field) for field in fields} for row in page]
 
         return jsonify({
             'message': 'Search history retrieved',
-            'data': articles_data
+            'data': articles_data,
+            'next_cursor': next_cursor
         })
 
     except Exception as e:
@@ -534,7 +810,7 @@ def get_user_searches(current_user):
 
 
 @app.route('/article/<int:article_id>/', methods=['GET'])
-@token_required
+@principal_required
 def get_article_data(current_user, article_id):
     try:
         article = ArticleSearch.query.filter_by(id=article_id).first()
@@ -1196,7 +1472,7 @@ def report(current_user):
 
 
 @app.route('/user/stats', methods=['GET'])
-@token_required
+@principal_required
 def fetch_stats(current_user):
     try:
         print(current_user.email)
@@ -1206,106 +1482,79 @@ def fetch_stats(current_user):
         thirty_days_ago = datetime.utcnow() - timedelta(days=30)
         one_year_ago = datetime.utcnow() - timedelta(days=365)  # New: For yearly data
 
-        # Get recent articles (last 24 hours)
-        recent_articles = ArticleSearch.query.join(ArticleRequest).filter(
+        # Only the last 24 hours are listed, with just the columns shown. This
+        # rolling window is also counted from these raw rows.
+        recent_articles = db.session.query(
+            ArticleSearch.id,
+            ArticleSearch.url,
+            ArticleSearch.title,
+            ArticleSearch.reliability_score,
+            ArticleSearch.credibility_score,
+            ArticleSearch.objectivity_score,
+            ArticleSearch.bias_prediction,
+            ArticleSearch.bias_probabilities,
+            ArticleSearch.created_at,
+        ).join(ArticleRequest).filter(
             ArticleRequest.user_id == current_user.id,
             ArticleRequest.created_at >= twenty_four_hours_ago
         ).all()
 
-        # Get weekly articles
-        weekly_articles = ArticleSearch.query.join(ArticleRequest).filter(
-            ArticleRequest.user_id == current_user.id,
-            ArticleRequest.created_at >= seven_days_ago
-        ).all()
-
-        # Get monthly articles
-        monthly_articles = ArticleSearch.query.join(ArticleRequest).filter(
-            ArticleRequest.user_id == current_user.id,
-            ArticleRequest.created_at >= thirty_days_ago
-        ).all()
-
-        # Get yearly articles (new)
-        yearly_articles = ArticleSearch.query.join(ArticleRequest).filter(
-            ArticleRequest.user_id == current_user.id,
-            ArticleRequest.created_at >= one_year_ago
-        ).all()
-
-        # Get all-time articles count
-        total_articles = ArticleRequest.query.filter(
-            ArticleRequest.user_id == current_user.id
-        ).count()
-
-        # Calculate average scores for accuracy metrics
-        # Daily (last 24 hours)
-        daily_scores = []
-        for article in recent_articles:
-            daily_scores.append(article.reliability_score)
+        daily_count = len(recent_articles)
+        daily_scores = [article.reliability_score for article in recent_articles
+                        if article.reliability_score is not None]
         avg_daily_accuracy = sum(daily_scores) / len(daily_scores) if daily_scores else 0
 
-        # Weekly
-        weekly_scores = []
-        for article in weekly_articles:
-            weekly_scores.append(article.reliability_score)
-        avg_weekly_accuracy = sum(weekly_scores) / len(weekly_scores) if weekly_scores else 0
-
-        # Monthly
-        monthly_scores = []
-        for article in monthly_articles:
-            monthly_scores.append(article.reliability_score)
-        avg_monthly_accuracy = sum(monthly_scores) / len(monthly_scores) if monthly_scores else 0
-
-        # Yearly (new)
-        yearly_scores = []
-        for article in yearly_articles:
-            yearly_scores.append(article.reliability_score)
-        avg_yearly_accuracy = sum(yearly_scores) / len(yearly_scores) if yearly_scores else 0
-
-        # Get article distribution by day for the past week
-        daily_counts = db.session.query(
-            func.date(ArticleRequest.created_at).label('date'),
-            func.count(ArticleRequest.article_id).label('count')
-        ).filter(
-            ArticleRequest.user_id == current_user.id,
-            ArticleRequest.created_at >= seven_days_ago
-        ).group_by(
-            func.date(ArticleRequest.created_at)
-        ).all()
-
-        daily_distribution = {
-            str(day.date): day.count for day in daily_counts
+        # Longer windows come from the per-day rollup, so their cost doesn't
+        # grow with the user's history (FILTER = conditional aggregation)
+        windows = {
+            'weekly': seven_days_ago.date(),
+            'monthly': thirty_days_ago.date(),
+            'yearly': one_year_ago.date(),
         }
-
-        # Get article distribution by week (last 4 weeks)
+        columns = [func.coalesce(func.sum(UserDailyStats.article_count), 0).label('total')]
+        for name, since in windows.items():
+            in_window = UserDailyStats.day >= since
+            columns += [
+                func.coalesce(func.sum(UserDailyStats.article_count).filter(in_window), 0).label(f'{name}_count'),
+                func.sum(UserDailyStats.reliability_sum).filter(in_window).label(f'{name}_reliability_sum'),
+                func.sum(UserDailyStats.reliability_count).filter(in_window).label(f'{name}_reliability_count'),
+            ]
+        window_stats = db.session.query(*columns).filter(
+            UserDailyStats.user_id == current_user.id
+        ).one()
+
+        def window_accuracy(name):
+            scored = getattr(window_stats, f'{name}_reliability_count')
+            return getattr(window_stats, f'{name}_reliability_sum') / scored if scored else 0
+
+        total_articles = window_stats.total
+        avg_weekly_accuracy = window_accuracy('weekly')
+        avg_monthly_accuracy = window_accuracy('monthly')
+        avg_yearly_accuracy = window_accuracy('yearly')
+
+        # The day, week and month distributions are rolled up from the
+        # user's rollup rows for the last year
         four_weeks_ago = datetime.utcnow() - timedelta(weeks=4)
-        weekly_counts = db.session.query(
-            func.date_trunc('week', ArticleRequest.created_at).label('week'),
-            func.count(ArticleRequest.article_id).label('count')
+        day_counts = db.session.query(
+            UserDailyStats.day,
+            UserDailyStats.article_count,
         ).filter(
-            ArticleRequest.user_id == current_user.id,
-            ArticleRequest.created_at >= four_weeks_ago
-        ).group_by(
-            func.date_trunc('week', ArticleRequest.created_at)
-        ).all()
-
-        weekly_distribution = {
-            str(week.week.date()): week.count for week in weekly_counts
-        }
-
-        # Get article distribution by month (last 12 months for yearly view)
-        twelve_months_ago = datetime.utcnow() - timedelta(days=365)
-        monthly_counts = db.session.query(
-            func.date_trunc('month', ArticleRequest.created_at).label('month'),
-            func.count(ArticleRequest.article_id).label('count')
-        ).filter(
-            ArticleRequest.user_id == current_user.id,
-            ArticleRequest.created_at >= twelve_months_ago
-        ).group_by(
-            func.date_trunc('month', ArticleRequest.created_at)
-        ).all()
-
-        monthly_distribution = {
-            str(month.month.date()): month.count for month in monthly_counts
-        }
+            UserDailyStats.user_id == current_user.id,
+            UserDailyStats.day >= one_year_ago.date()
+        ).order_by(UserDailyStats.day).all()
+
+        daily_distribution = {}
+        weekly_distribution = {}
+        monthly_distribution = {}
+        for day in day_counts:
+            if day.day >= seven_days_ago.date():
+                daily_distribution[str(day.day)] = day.article_count
+            if day.day >= four_weeks_ago.date():
+                # Weeks start on Monday, like date_trunc('week', ...)
+                week = str(day.day - timedelta(days=day.day.weekday()))
+                weekly_distribution[week] = weekly_distribution.get(week, 0) + day.article_count
+            month = str(day.day.replace(day=1))
+            monthly_distribution[month] = monthly_distribution.get(month, 0) + day.article_count
 
         # Calculate quarterly distribution for yearly view (new)
         quarterly_distribution = {}
@@ -1335,24 +1584,24 @@ def fetch_stats(current_user):
 
         return jsonify({
             # Daily stats
-            'articles_analyzed': len(recent_articles),
-            'articles_analyzed_daily': len(recent_articles),  # Duplicate for mobile app compatibility
-            'daily_usage_left': app.config['DAILY_USAGE'] - len(recent_articles),
+            'articles_analyzed': daily_count,
+            'articles_analyzed_daily': daily_count,  # Duplicate for mobile app compatibility
+            'daily_usage_left': app.config['DAILY_USAGE'] - daily_count,
             'daily_accuracy': avg_daily_accuracy,
             'daily_distribution': daily_distribution,
 
             # Weekly stats
-            'articles_analyzed_weekly': len(weekly_articles),
+            'articles_analyzed_weekly': window_stats.weekly_count,
             'weekly_accuracy': avg_weekly_accuracy,
             'weekly_distribution': weekly_distribution,
 
             # Monthly stats
-            'articles_analyzed_monthly': len(monthly_articles),
+            'articles_analyzed_monthly': window_stats.monthly_count,
             'monthly_accuracy': avg_monthly_accuracy,
             'monthly_distribution': monthly_distribution,
 
             # Yearly stats (new)
-            'articles_analyzed_yearly': len(yearly_articles),
+            'articles_analyzed_yearly': window_stats.yearly_count,
             'yearly_accuracy': avg_yearly_accuracy,
             'quarterly_distribution': quarterly_distribution,
 
@@ -0,0 +1,78 @@
+"""
+Compare HTML parser backends on a corpus of saved news pages.
+
+Usage:
+    python benchmarks/parser_benchmark.py path/to/pages [--repeat 3]
+
+Every *.html / *.htm file under the directory is parsed with each installed
+parser, then run through the title, content and date finders. The report shows
+parse and extraction time per parser and how often the extracted title,
+content and date match html.parser's output.
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ArticleAnalyzer import (clean_content, find_date, find_enhanced_content,  # noqa: E402
+                             find_enhanced_title, find_main_content, find_title)
+from html_parsing import available_parsers, make_soup  # noqa: E402
+
+
+def extract(soup):
+    title = find_enhanced_title(soup) or find_title(soup)
+    content_element = find_enhanced_content(soup) or find_main_content(soup)
+    content = clean_content(content_element) if content_element else ''
+    return title, content, find_date(soup)
+
+
+def load_corpus(directory):
+    pages = []
+    for path in sorted(Path(directory).rglob('*')):
+        if path.suffix.lower() in ('.html', '.htm'):
+            pages.append((path.name, path.read_text(encoding='utf-8', errors='replace')))
+    return pages
+
+
+def benchmark(pages, parser, repeat):
+    parse_time = 0.0
+    extract_time = 0.0
+    results = {}
+    for name, html in pages:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            soup = make_soup(html, parser)
+            parsed = time.perf_counter()
+            results[name] = extract(soup)
+            extract_time += time.perf_counter() - parsed
+            parse_time += parsed - started
+    return parse_time / repeat, extract_time / repeat, results
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('corpus', help='Directory of saved HTML pages')
+    arg_parser.add_argument('--repeat', type=int, default=3, help='Runs per page (default: 3)')
+    args = arg_parser.parse_args()
+
+    pages = load_corpus(args.corpus)
+    if not pages:
+        sys.exit(f"No .html files found in {args.corpus}")
+    print(f"Corpus: {len(pages)} pages, {sum(len(h) for _, h in pages) / 1024:.0f} KiB")
+
+    reports = {parser: benchmark(pages, parser, args.repeat) for parser in available_parsers()}
+    baseline = reports['html.parser'][2]
+
+    print(f"\n{'parser':<12} {'parse (s)':>10} {'extract (s)':>12} {'total (s)':>10} "
+          f"{'title =':>8} {'content =':>10} {'date =':>7}")
+    for parser, (parse_time, extract_time, results) in reports.items():
+        matches = [sum(results[name][i] == baseline[name][i] for name in baseline) for i in range(3)]
+        print(f"{parser:<12} {parse_time:>10.3f} {extract_time:>12.3f} {parse_time + extract_time:>10.3f} "
+              f"{matches[0]:>8} {matches[1]:>10} {matches[2]:>7}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""
+Compare similarity backends on a set of article groups.
+
+Usage:
+    python benchmarks/similarity_benchmark.py groups.jsonl [--baseline gemini]
+
+Each line of the input file is a JSON object {"main": "...", "candidates":
+["...", ...]}: a main article's text and the texts of its similar-article
+candidates. Every backend scores every group; the report shows scoring time
+per group and, against the baseline backend, the Pearson and Spearman
+correlation of the scores, the mean absolute difference and how often both
+backends rank the same candidate first.
+
+The gemini backend needs GENAI_API_KEY; without it only local backends run.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from similarity import SIMILARITY_BACKENDS, get_similarity_backend  # noqa: E402
+
+
+def load_groups(path):
+    groups = []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                group = json.loads(line)
+                if group.get('candidates'):
+                    groups.append((group['main'], group['candidates']))
+    return groups
+
+
+def benchmark(groups, name):
+    backend = get_similarity_backend(name)
+    elapsed = 0.0
+    scores = []
+    for main_text, candidates in groups:
+        started = time.perf_counter()
+        scores.append(backend.scores(main_text, candidates))
+        elapsed += time.perf_counter() - started
+    return elapsed / len(groups), scores
+
+
+def rank(values):
+    ranks = np.empty(len(values))
+    ranks[np.argsort(values)] = np.arange(len(values))
+    return ranks
+
+
+def agreement(scores, baseline):
+    flat, flat_baseline = np.concatenate(scores), np.concatenate(baseline)
+    pearson = np.corrcoef(flat, flat_baseline)[0, 1]
+    spearman = np.corrcoef(rank(flat), rank(flat_baseline))[0, 1]
+    mean_abs_diff = float(np.mean(np.abs(flat - flat_baseline)))
+    top1 = sum(np.argmax(s) == np.argmax(b) for s, b in zip(scores, baseline)) / len(scores)
+    return pearson, spearman, mean_abs_diff, top1
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('groups', help='JSONL file of {"main", "candidates"} groups')
+    arg_parser.add_argument('--baseline', default='gemini', choices=list(SIMILARITY_BACKENDS),
+                            help='Backend the others are compared to (default: gemini)')
+    args = arg_parser.parse_args()
+
+    groups = load_groups(args.groups)
+    if not groups:
+        sys.exit(f"No groups with candidates found in {args.groups}")
+    print(f"Groups: {len(groups)}, candidates: {sum(len(c) for _, c in groups)}")
+
+    reports = {}
+    for name in SIMILARITY_BACKENDS:
+        try:
+            reports[name] = benchmark(groups, name)
+        except Exception as e:
+            print(f"Skipping {name}: {e}")
+
+    baseline = reports.get(args.baseline)
+    print(f"\n{'backend':<10} {'ms/group':>9} {'pearson':>8} {'spearman':>9} {'mean |d|':>9} {'top-1 =':>8}")
+    for name, (per_group, scores) in reports.items():
+        line = f"{name:<10} {per_group * 1000:>9.1f}"
+        if baseline is not None:
+            pearson, spearman, mean_abs_diff, top1 = agreement(scores, baseline[1])
+            line += f" {pearson:>8.3f} {spearman:>9.3f} {mean_abs_diff:>9.3f} {top1:>8.0%}"
+        print(line)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+from typing import Dict, List, Optional
+
+from bs4.element import CData, NavigableString, Tag
+
+# Same string types Tag.get_text() considers: no comments, scripts or styles
+TEXT_STRING_TYPES = (NavigableString, CData)
+
+
+class NodeStats:
+    """Text statistics for one element, including all of its descendants."""
+
+    __slots__ = ('tag', 'text_length', 'paragraphs', 'link_text_length')
+
+    def __init__(self, tag):
+        self.tag = tag
+        self.text_length = 0
+        self.paragraphs = 0
+        self.link_text_length = 0
+
+    @property
+    def link_density(self) -> float:
+        return self.link_text_length / self.text_length if self.text_length else 0.0
+
+
+class DomScores:
+    """
+    Per-element text statistics computed in a single bottom-up pass.
+
+    `text_length` matches len(tag.get_text(strip=True)), so callers can use it
+    wherever they used to re-stringify an element.
+    """
+
+    def __init__(self, soup):
+        self.nodes: List[NodeStats] = []
+        self._by_id: Dict[int, NodeStats] = {}
+
+        root = NodeStats(soup)
+        self._by_id[id(soup)] = root
+
+        # Document order: every element comes before its descendants
+        for node in soup.descendants:
+            if isinstance(node, Tag):
+                stats = NodeStats(node)
+                self.nodes.append(stats)
+                self._by_id[id(node)] = stats
+            elif type(node) in TEXT_STRING_TYPES:
+                length = len(node.strip())
+                if length:
+                    self._by_id[id(node.parent)].text_length += length
+
+        # Reverse document order visits children before their parents
+        for stats in reversed(self.nodes):
+            tag = stats.tag
+            if tag.name == 'a':
+                stats.link_text_length = stats.text_length
+            parent = self._by_id.get(id(tag.parent))
+            if parent is None:
+                continue
+            parent.text_length += stats.text_length
+            parent.link_text_length += stats.link_text_length
+            parent.paragraphs += stats.paragraphs + (1 if tag.name == 'p' else 0)
+
+    def get(self, tag) -> Optional[NodeStats]:
+        return self._by_id.get(id(tag))
+
+    def best_node(self, name='div', min_length=300) -> Optional[Tag]:
+        """
+        Return the `name` element with the most text, if any has more than
+        `min_length` characters. Ties go to the first element in the document,
+        like max() over find_all() did.
+        """
+        best = None
+        for stats in self.nodes:
+            if stats.tag.name != name or stats.text_length <= min_length:
+                continue
+            if best is None or stats.text_length > best.text_length:
+                best = stats
+        return best.tag if best else None
+
+
+def find_text_rich_node(soup, name='div', min_length=300) -> Optional[Tag]:
+    """Find the element with the most text without re-stringifying nested elements."""
+    return DomScores(soup).best_node(name, min_length)
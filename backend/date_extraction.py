@@ -0,0 +1,158 @@
+import json
+import re
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Optional
+
+from bs4.element import Tag
+
+DATE_FORMATS = [
+    '%Y-%m-%d',
+    '%B %d, %Y',
+    '%d %B %Y',
+    '%m/%d/%Y',
+    '%d/%m/%Y',
+    '%Y/%m/%d',
+]
+
+# Checked in this order; a property= or name= attribute can match
+META_DATE_PROPERTIES = [
+    'article:published_time',
+    'og:published_time',
+    'publication_date',
+    'date',
+    'datePublished',
+    'publish_date'
+]
+
+_MONTHS = r'(?:January|February|March|April|May|June|July|August|September|October|November|December)'
+
+# Every absolute date pattern in one alternation, so the text is scanned once.
+# Relative phrases ("3 weeks ago", "yesterday") are not included because
+# standardize_date can never turn them into a date.
+TEXT_DATE_PATTERN = re.compile(
+    r'\d{4}-\d{2}-\d{2}'
+    rf'|\d{{1,2}}\s+{_MONTHS}\s+\d{{4}}'
+    rf'|{_MONTHS}\s+\d{{1,2}},?\s+\d{{4}}'
+    r'|\d{1,2}/\d{1,2}/\d{4}'
+)
+
+MAX_CACHED_DOMAINS = 1024
+
+# Numeric day/month formats that can both match the same string (03/04/2024).
+# They are never cached, so such dates are always read in DATE_FORMATS order.
+AMBIGUOUS_FORMATS = {'%m/%d/%Y', '%d/%m/%Y'}
+
+# Last date format that worked for each domain, tried first next time
+_domain_formats = OrderedDict()
+_domain_formats_lock = threading.Lock()
+
+
+def standardize_date(date_str: str, domain: Optional[str] = None) -> Optional[str]:
+    """
+    Standardize a date string to YYYY-MM-DD.
+
+    Sites use the same date format on every page, so the format that worked
+    last time for `domain` is tried before the others. Ambiguous day/month
+    formats are not remembered.
+    """
+    date_str = date_str.strip()
+
+    formats = DATE_FORMATS
+    if domain:
+        with _domain_formats_lock:
+            cached = _domain_formats.get(domain)
+        if cached:
+            formats = [cached] + [fmt for fmt in DATE_FORMATS if fmt != cached]
+
+    for fmt in formats:
+        try:
+            parsed_date = datetime.strptime(date_str, fmt)
+        except ValueError:
+            continue
+        if domain and fmt not in AMBIGUOUS_FORMATS:
+            with _domain_formats_lock:
+                _domain_formats[domain] = fmt
+                _domain_formats.move_to_end(domain)
+                if len(_domain_formats) > MAX_CACHED_DOMAINS:
+                    _domain_formats.popitem(last=False)
+        return parsed_date.strftime('%Y-%m-%d')
+    print(f"Could not parse date: {date_str}")
+    return None
+
+
+def _collect_date_metadata(soup):
+    """Read meta tags, JSON-LD scripts and the first <time> tag in one pass."""
+    meta_dates = {}
+    json_ld = []
+    time_value = None
+    wanted = set(META_DATE_PROPERTIES)
+
+    for tag in soup.find_all(['meta', 'script', 'time']):
+        if tag.name == 'meta':
+            content = tag.get('content')
+            if not content:
+                continue
+            for key in (tag.get('property'), tag.get('name')):
+                if key in wanted and key not in meta_dates:
+                    meta_dates[key] = content
+        elif tag.name == 'script':
+            if tag.get('type') == 'application/ld+json':
+                json_ld.append(tag.string)
+        elif time_value is None:
+            # Only the first <time> tag is considered, with or without a value
+            time_value = tag.get('datetime') or tag.get('content') or ''
+
+    return meta_dates, json_ld, time_value
+
+
+def _visible_text(soup):
+    root = soup.body if isinstance(soup.body, Tag) else soup
+    # get_text() skips comments, scripts and styles
+    return root.get_text(' ')
+
+
+def find_date(soup, domain: Optional[str] = None) -> Optional[str]:
+    """
+    Find the publication date of a page.
+
+    Structured metadata is tried first (meta tags, JSON-LD, <time>), all read
+    in a single traversal. Only if none of it parses is the page's visible text
+    scanned, once, for a date-like string.
+    """
+    meta_dates, json_ld, time_value = _collect_date_metadata(soup)
+
+    for meta_property in META_DATE_PROPERTIES:
+        content = meta_dates.get(meta_property)
+        if content:
+            standardized = standardize_date(content.split('T')[0], domain)
+            if standardized:
+                return standardized
+
+    for script in json_ld:
+        try:
+            data = json.loads(script)
+            if isinstance(data, dict):
+                date = data.get('datePublished') or data.get('dateCreated')
+                if date:
+                    standardized = standardize_date(date.split('T')[0], domain)
+                    if standardized:
+                        return standardized
+        except Exception as e:
+            print(f"Error parsing JSON-LD date: {e}")
+
+    if time_value:
+        standardized = standardize_date(time_value.split('T')[0], domain)
+        if standardized:
+            return standardized
+
+    try:
+        for date_match in TEXT_DATE_PATTERN.finditer(_visible_text(soup)):
+            standardized = standardize_date(date_match.group(), domain)
+            if standardized:
+                return standardized
+    except Exception as e:
+        print(f"Error matching date in page text: {e}")
+
+    return None
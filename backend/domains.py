@@ -0,0 +1,65 @@
+import os
+from functools import lru_cache
+from typing import Dict, Iterable, List
+from urllib.parse import urlsplit
+
+import tldextract
+
+# Public suffix list bundled with tldextract; never fetched or cached on disk
+_extractor = tldextract.TLDExtract(suffix_list_urls=(), cache_dir=None)
+
+DOMAIN_CACHE_SIZE = int(os.getenv('DOMAIN_CACHE_SIZE', 50000))
+
+
+def hostname_of(url: str) -> str:
+    """The lowercased hostname of a URL, which may lack a scheme ("bbc.com/news")."""
+    url = (url or '').strip()
+    if '//' not in url:
+        url = '//' + url
+    try:
+        return (urlsplit(url).hostname or '').rstrip('.')
+    except ValueError:
+        return ''
+
+
+@lru_cache(maxsize=DOMAIN_CACHE_SIZE)
+def split_hostname(hostname: str):
+    """
+    Split a hostname into its publisher name and public suffix.
+
+    Examples:
+    - www.bbc.com -> ("bbc", "com")
+    - sports.bbc.co.uk -> ("bbc", "co.uk")
+    - 127.0.0.1 -> ("127.0.0.1", "")
+
+    Args:
+        hostname (str): A lowercased hostname, as returned by hostname_of
+
+    Returns:
+        tuple: (domain, suffix); empty strings for an empty hostname
+    """
+    if not hostname:
+        return '', ''
+    extracted = _extractor(hostname)
+    return extracted.domain, extracted.suffix
+
+
+def domain_name(url: str) -> str:
+    """The publisher name of a URL without subdomains or suffix, e.g. "cnn"."""
+    return split_hostname(hostname_of(url))[0]
+
+
+def registered_domain(hostname: str) -> str:
+    """The registered domain of a hostname, e.g. news.bbc.co.uk -> bbc.co.uk."""
+    domain, suffix = split_hostname(hostname)
+    return f"{domain}.{suffix}" if domain and suffix else domain
+
+
+def registered_domains(hostnames: Iterable[str]) -> Dict[str, str]:
+    """Map each distinct hostname to its registered domain."""
+    return {hostname: registered_domain(hostname) for hostname in set(hostnames)}
+
+
+def domain_names(urls: Iterable[str]) -> List[str]:
+    """Publisher names for a batch of URLs, in order, e.g. to filter search results."""
+    return [domain_name(url) for url in urls]
@@ -0,0 +1,293 @@
+import atexit
+import multiprocessing.util
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+
+class DriverPoolTimeout(Exception):
+    """Raised when no browser driver could be leased before the timeout."""
+    pass
+
+
+class PooledDriver:
+    """A browser driver plus the bookkeeping the pool needs to recycle it."""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+        self.pages_served = 0
+
+
+class DriverPool:
+    """
+    Bounded pool of pre-launched browser drivers.
+
+    Drivers are leased with `driver()` and returned automatically. A driver
+    is recycled (quit and replaced) after `max_pages` page loads, after it has
+    been idle for longer than `idle_timeout` seconds, or when it fails the
+    health check or crashes while leased. A background reaper quits idle
+    drivers on time even when no leases come in.
+
+    Args:
+        factory (callable): Returns a new driver, or None if launching failed
+        size (int): Maximum number of live drivers
+        idle_timeout (float): Seconds an idle driver is kept before it is quit
+        max_pages (int): Page loads served before a driver is recycled
+        lease_timeout (float): Seconds to wait for a free driver
+    """
+
+    def __init__(self, factory, size=2, idle_timeout=300, max_pages=50, lease_timeout=120):
+        self.factory = factory
+        self.size = size
+        self.idle_timeout = idle_timeout
+        self.max_pages = max_pages
+        self.lease_timeout = lease_timeout
+
+        self._idle = []
+        self._leased = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+        # Metrics
+        self._launched = 0
+        self._recycled = 0
+        self._leases = 0
+        self._lease_wait_total = 0.0
+        self._lease_wait_max = 0.0
+
+        self._stop = threading.Event()
+        self._reaper = threading.Thread(target=self._reap, name='driver-pool-reaper', daemon=True)
+        self._reaper.start()
+
+    def warm(self, count=None):
+        """Launch drivers up front so the first leases don't pay the startup cost."""
+        count = self.size if count is None else min(count, self.size)
+        while True:
+            with self._cond:
+                if self._closed or len(self._idle) + self._leased >= count:
+                    return
+                # Reserve the slot while launching outside the lock
+                self._leased += 1
+            pooled = self._launch()
+            with self._cond:
+                self._leased -= 1
+                if pooled is None:
+                    self._cond.notify()
+                    return
+                self._idle.append(pooled)
+                self._cond.notify()
+
+    @contextmanager
+    def driver(self, timeout=None):
+        """
+        Lease a driver for the duration of the `with` block.
+
+        The driver is marked broken (and recycled) if the block raises.
+        Yields None if a driver could not be launched.
+        """
+        pooled = self.lease(timeout)
+        broken = False
+        try:
+            yield pooled.driver if pooled else None
+        except Exception:
+            broken = True
+            raise
+        finally:
+            if pooled:
+                self.release(pooled, broken=broken)
+
+    def lease(self, timeout=None):
+        """
+        Take a healthy driver out of the pool, launching one if there is room.
+
+        Returns:
+            PooledDriver or None: None if the factory failed to launch a driver
+
+        Raises:
+            DriverPoolTimeout: If every driver stayed leased for `timeout` seconds
+        """
+        timeout = self.lease_timeout if timeout is None else timeout
+        started = time.monotonic()
+        deadline = started + timeout
+
+        while True:
+            stale = []
+            pooled = None
+            launch = False
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise DriverPoolTimeout("Driver pool is closed")
+                    stale.extend(self._pop_expired())
+                    if self._idle:
+                        pooled = self._idle.pop()
+                        self._leased += 1
+                        break
+                    if self._leased < self.size:
+                        # Reserve the slot while launching outside the lock
+                        self._leased += 1
+                        launch = True
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise DriverPoolTimeout(f"No browser driver available after {timeout}s")
+                    self._cond.wait(remaining)
+
+            for old in stale:
+                self._quit(old)
+
+            if launch:
+                pooled = self._launch()
+                if pooled is None:
+                    with self._cond:
+                        self._leased -= 1
+                        self._cond.notify()
+                    self._record_wait(started)
+                    return None
+            elif not self._is_healthy(pooled):
+                print("[DEBUG] DriverPool: Discarding unhealthy driver")
+                with self._cond:
+                    self._leased -= 1
+                    self._recycled += 1
+                self._quit(pooled)
+                continue
+
+            self._record_wait(started)
+            return pooled
+
+    def release(self, pooled, broken=False):
+        """Return a leased driver, recycling it if it is broken or worn out."""
+        pooled.pages_served += 1
+        pooled.last_used = time.monotonic()
+        recycle = broken or pooled.pages_served >= self.max_pages
+
+        with self._cond:
+            self._leased -= 1
+            stale = self._pop_expired()
+            if recycle or self._closed:
+                self._recycled += 1
+            else:
+                self._idle.append(pooled)
+            self._cond.notify()
+
+        if recycle or self._closed:
+            self._quit(pooled)
+        for old in stale:
+            self._quit(old)
+
+    def stats(self):
+        """Snapshot of pool occupancy and lease wait metrics."""
+        with self._cond:
+            return {
+                "size": self.size,
+                "leased": self._leased,
+                "idle": len(self._idle),
+                "occupancy": self._leased / self.size if self.size else 0.0,
+                "launched": self._launched,
+                "recycled": self._recycled,
+                "leases": self._leases,
+                "avg_lease_wait": self._lease_wait_total / self._leases if self._leases else 0.0,
+                "max_lease_wait": self._lease_wait_max,
+            }
+
+    def close(self):
+        """Quit every idle driver and stop handing out new ones."""
+        self._stop.set()
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._cond.notify_all()
+        for pooled in idle:
+            self._quit(pooled)
+
+    def _pop_expired(self):
+        now = time.monotonic()
+        expired = [p for p in self._idle if now - p.last_used > self.idle_timeout]
+        if expired:
+            self._idle = [p for p in self._idle if p not in expired]
+            self._recycled += len(expired)
+        return expired
+
+    def _reap(self):
+        # Waits on its own event rather than the condition so it never
+        # swallows a notify meant for a waiting lease
+        interval = max(min(self.idle_timeout / 2, 60), 1)
+        while not self._stop.wait(interval):
+            with self._cond:
+                stale = self._pop_expired()
+            for old in stale:
+                print("[DEBUG] DriverPool: Quitting idle driver")
+                self._quit(old)
+
+    def _launch(self):
+        try:
+            driver = self.factory()
+        except Exception as e:
+            print(f"[DEBUG] DriverPool: Error launching driver: {e}")
+            driver = None
+        if driver is None:
+            return None
+        with self._cond:
+            self._launched += 1
+        return PooledDriver(driver)
+
+    def _record_wait(self, started):
+        waited = time.monotonic() - started
+        with self._cond:
+            self._leases += 1
+            self._lease_wait_total += waited
+            self._lease_wait_max = max(self._lease_wait_max, waited)
+            leased = self._leased
+        print(f"[DEBUG] DriverPool: Leased driver after {waited:.2f}s ({leased}/{self.size} in use)")
+
+    @staticmethod
+    def _is_healthy(pooled):
+        try:
+            pooled.driver.execute_script("return 1")
+            return True
+        except Exception:
+            return False
+
+    @staticmethod
+    def _quit(pooled):
+        try:
+            pooled.driver.quit()
+        except Exception as e:
+            print(f"[DEBUG] DriverPool: Error quitting driver: {e}")
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_driver_pool():
+    """
+    Return the process-wide driver pool, creating it on first use.
+
+    Configured through DRIVER_POOL_SIZE, DRIVER_POOL_IDLE_TIMEOUT,
+    DRIVER_POOL_MAX_PAGES, DRIVER_POOL_LEASE_TIMEOUT and DRIVER_POOL_PREWARM.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            from ArticleExtractor import create_driver
+
+            _pool = DriverPool(
+                create_driver,
+                size=int(os.getenv("DRIVER_POOL_SIZE", 2)),
+                idle_timeout=float(os.getenv("DRIVER_POOL_IDLE_TIMEOUT", 300)),
+                max_pages=int(os.getenv("DRIVER_POOL_MAX_PAGES", 50)),
+                lease_timeout=float(os.getenv("DRIVER_POOL_LEASE_TIMEOUT", 120)),
+            )
+            # Quit the browsers on exit, including in multiprocessing workers
+            # where atexit handlers don't run.
+            atexit.register(_pool.close)
+            multiprocessing.util.Finalize(None, _pool.close, exitpriority=10)
+
+            prewarm = os.getenv("DRIVER_POOL_PREWARM", "False").lower() == "true"
+            if prewarm:
+                _pool.warm()
+        return _pool
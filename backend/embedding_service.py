@@ -0,0 +1,156 @@
+import hashlib
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import List
+
+import numpy as np
+
+EMBEDDING_MODEL = "text-embedding-004"
+
+# Most texts the embedding API accepts in one batch request
+MAX_BATCH_SIZE = 100
+
+
+def cosine_similarity(v1, v2) -> float:
+    norm = np.linalg.norm(v1) * np.linalg.norm(v2)
+    if norm == 0:
+        return 0.0
+    return float(np.dot(v1, v2) / norm)
+
+
+class EmbeddingCache:
+    """
+    LRU cache of embedding vectors keyed by content hash, with an optional
+    SQLite file behind it so vectors survive restarts and are shared between
+    processes.
+    """
+
+    def __init__(self, max_size=1024, path=None):
+        self.max_size = max_size
+        self._vectors = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        if path:
+            try:
+                self._db = sqlite3.connect(path, check_same_thread=False)
+                self._db.execute("CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB)")
+                self._db.commit()
+            except sqlite3.Error as e:
+                print(f"Error opening embedding cache at {path}: {e}")
+                self._db = None
+
+    @staticmethod
+    def key(model, text):
+        return hashlib.sha256(f"{model}\0{text}".encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        with self._lock:
+            vector = self._vectors.get(key)
+            if vector is not None:
+                self._vectors.move_to_end(key)
+                return vector
+            if self._db is None:
+                return None
+            try:
+                row = self._db.execute("SELECT vector FROM embeddings WHERE key = ?", (key,)).fetchone()
+            except sqlite3.Error as e:
+                print(f"Error reading embedding cache: {e}")
+                return None
+        if row is None:
+            return None
+        vector = np.frombuffer(row[0], dtype=np.float32)
+        self._remember(key, vector)
+        return vector
+
+    def set(self, key, vector):
+        vector = np.asarray(vector, dtype=np.float32)
+        self._remember(key, vector)
+        if self._db is not None:
+            with self._lock:
+                try:
+                    self._db.execute("INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                                     (key, vector.tobytes()))
+                    self._db.commit()
+                except sqlite3.Error as e:
+                    print(f"Error writing embedding cache: {e}")
+
+    def _remember(self, key, vector):
+        with self._lock:
+            self._vectors[key] = vector
+            self._vectors.move_to_end(key)
+            while len(self._vectors) > self.max_size:
+                self._vectors.popitem(last=False)
+
+
+class EmbeddingService:
+    """
+    Embeds texts with the Gemini embedding API, batching cache misses into
+    as few requests as possible and reusing one API client.
+    """
+
+    def __init__(self, api_key, model=EMBEDDING_MODEL, cache=None):
+        from google import genai
+
+        self.client = genai.Client(api_key=api_key)
+        self.model = model
+        self.cache = cache or EmbeddingCache()
+        self.requests_made = 0
+
+    def embed(self, text: str) -> np.ndarray:
+        return self.embed_many([text])[0]
+
+    def embed_many(self, texts: List[str]) -> List[np.ndarray]:
+        """Embed texts in order; only texts missing from the cache hit the API."""
+        keys = [EmbeddingCache.key(self.model, text) for text in texts]
+        vectors = [self.cache.get(key) for key in keys]
+
+        # Deduplicate misses so identical texts are embedded once
+        missing = OrderedDict()
+        for text, key, vector in zip(texts, keys, vectors):
+            if vector is None:
+                missing.setdefault(key, text)
+
+        embedded = {}
+        missing_items = list(missing.items())
+        for start in range(0, len(missing_items), MAX_BATCH_SIZE):
+            batch = missing_items[start:start + MAX_BATCH_SIZE]
+            resp = self.client.models.embed_content(
+                model=self.model,
+                contents=[text for _, text in batch],
+            )
+            self.requests_made += 1
+            for (key, _), embedding in zip(batch, resp.embeddings):
+                embedded[key] = np.asarray(embedding.values, dtype=np.float32)
+                self.cache.set(key, embedded[key])
+
+        return [vector if vector is not None else embedded[key]
+                for key, vector in zip(keys, vectors)]
+
+
+_service = None
+_service_pid = None
+_service_lock = threading.Lock()
+
+
+def get_embedding_service() -> EmbeddingService:
+    """
+    Return the process-wide embedding service, creating it on first use.
+
+    Uses GENAI_API_KEY. EMBEDDING_CACHE_SIZE sets the in-memory LRU size and
+    EMBEDDING_CACHE_PATH enables the on-disk SQLite store.
+    """
+    global _service, _service_pid
+    with _service_lock:
+        if _service is None or _service_pid != os.getpid():
+            api_key = os.getenv("GENAI_API_KEY")
+            if not api_key:
+                raise RuntimeError("GENAI_API_KEY is not set")
+            cache = EmbeddingCache(
+                max_size=int(os.getenv("EMBEDDING_CACHE_SIZE", 1024)),
+                path=os.getenv("EMBEDDING_CACHE_PATH"),
+            )
+            _service = EmbeddingService(api_key, cache=cache)
+            _service_pid = os.getpid()
+        return _service
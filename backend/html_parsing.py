@@ -0,0 +1,48 @@
+import os
+
+from bs4 import BeautifulSoup
+from bs4.builder import builder_registry
+
+# Fastest first. lxml is C-backed; html.parser is pure Python but always available.
+PARSER_PREFERENCE = ['lxml', 'html.parser']
+
+
+def available_parsers():
+    """Return the BeautifulSoup tree builders installed in this environment."""
+    return [name for name in PARSER_PREFERENCE if builder_registry.lookup(name) is not None]
+
+
+def _resolve_parser():
+    configured = os.getenv('HTML_PARSER')
+    if configured:
+        if builder_registry.lookup(configured) is not None:
+            return configured
+        print(f"HTML parser '{configured}' is not installed, falling back")
+    return available_parsers()[0]
+
+
+DEFAULT_PARSER = _resolve_parser()
+
+
+def make_soup(markup, parser=None):
+    """
+    Parse HTML with the fastest available parser.
+
+    The title, content and date finders only use the BeautifulSoup API, so they
+    work the same on any tree builder. Set HTML_PARSER to force one.
+
+    Args:
+        markup (str): The HTML to parse
+        parser (str): Optional tree builder name overriding the default
+
+    Returns:
+        BeautifulSoup: The parsed document
+    """
+    parser = parser or DEFAULT_PARSER
+    try:
+        return BeautifulSoup(markup, parser)
+    except Exception as e:
+        if parser == 'html.parser':
+            raise
+        print(f"Error parsing with {parser}, retrying with html.parser: {e}")
+        return BeautifulSoup(markup, 'html.parser')
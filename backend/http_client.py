@@ -0,0 +1,113 @@
+import http.cookiejar
+import os
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+
+
+def _parse_host_settings(value, cast):
+    """Parse "host=value,host2=value2" settings from the environment."""
+    settings = {}
+    for item in (value or '').split(','):
+        host, _, setting = item.partition('=')
+        host, setting = host.strip().lower(), setting.strip()
+        if host and setting:
+            try:
+                settings[host] = cast(setting)
+            except ValueError:
+                print(f"Ignoring invalid HTTP client setting: {item}")
+    return settings
+
+
+class HttpClient:
+    """
+    Process-wide HTTP client with keep-alive connection pools per host.
+
+    Wraps a single requests.Session so repeated calls to the same host reuse
+    TCP/TLS connections instead of handshaking every time. Hosts can get their
+    own pool size. Cookies are never stored, so nothing set by one scraped site
+    or API response carries over to later requests.
+
+    Args:
+        pool_maxsize (int): Default connections kept alive per host
+        default_timeout (float): Timeout used when a call doesn't pass one
+        host_limits (dict): Per-host pool sizes, e.g. {"api.example.com": 20}
+    """
+
+    def __init__(self, pool_maxsize=10, default_timeout=30, host_limits=None):
+        self.default_timeout = default_timeout
+        self.session = requests.Session()
+        self.session.cookies.set_policy(http.cookiejar.DefaultCookiePolicy(allowed_domains=[]))
+        self._adapters = []
+
+        default_adapter = HTTPAdapter(pool_connections=20, pool_maxsize=pool_maxsize)
+        self.session.mount('https://', default_adapter)
+        self.session.mount('http://', default_adapter)
+        self._adapters.append(default_adapter)
+
+        # requests picks the adapter with the longest matching prefix
+        for host, limit in (host_limits or {}).items():
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=limit)
+            self.session.mount(f'https://{host}/', adapter)
+            self.session.mount(f'http://{host}/', adapter)
+            self._adapters.append(adapter)
+
+    def request(self, method, url, **kwargs):
+        if kwargs.get('timeout') is None:
+            kwargs['timeout'] = self.default_timeout
+        return self.session.request(method, url, **kwargs)
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def stats(self):
+        """
+        Connection reuse per host.
+
+        Returns:
+            dict: host -> {"requests", "connections", "reused"}
+        """
+        stats = {}
+        for adapter in self._adapters:
+            pools = adapter.poolmanager.pools
+            for key in pools.keys():
+                pool = pools.get(key)
+                if pool is None:
+                    continue
+                host_stats = stats.setdefault(pool.host, {'requests': 0, 'connections': 0})
+                host_stats['requests'] += pool.num_requests
+                host_stats['connections'] += pool.num_connections
+        for host_stats in stats.values():
+            host_stats['reused'] = max(0, host_stats['requests'] - host_stats['connections'])
+        return stats
+
+    def close(self):
+        self.session.close()
+
+
+_client = None
+_client_pid = None
+_client_lock = threading.Lock()
+
+
+def get_http_client():
+    """
+    Return the process-wide HTTP client, creating it on first use.
+
+    A forked worker process gets its own client so pooled sockets are never
+    shared between processes. Configured through HTTP_POOL_MAXSIZE,
+    HTTP_DEFAULT_TIMEOUT and HTTP_HOST_LIMITS (a "host=value" list).
+    """
+    global _client, _client_pid
+    with _client_lock:
+        if _client is None or _client_pid != os.getpid():
+            _client = HttpClient(
+                pool_maxsize=int(os.getenv('HTTP_POOL_MAXSIZE', 10)),
+                default_timeout=float(os.getenv('HTTP_DEFAULT_TIMEOUT', 30)),
+                host_limits=_parse_host_settings(os.getenv('HTTP_HOST_LIMITS'), int),
+            )
+            _client_pid = os.getpid()
+        return _client
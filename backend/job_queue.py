@@ -0,0 +1,104 @@
+import concurrent.futures
+import os
+import uuid
+from datetime import datetime, timedelta
+
+from models import db, User, AnalysisJob
+
+# A job still 'running' this long after it was claimed lost its worker
+JOB_STALE_AFTER = float(os.getenv('JOB_STALE_AFTER', 1800))
+
+
+class JobQueue:
+    """
+    Runs article analyses in a local thread pool, outside the web request.
+
+    Jobs are rows in the analysis_jobs table, so their status and results are
+    visible to every web worker and survive a restart. A job is claimed with a
+    conditional UPDATE before it runs, so it never runs twice even if it is
+    submitted by more than one process.
+
+    Args:
+        app (Flask): Application whose context the jobs run in
+        handler (callable): handler(user, url) -> (result dict, status code)
+        max_workers (int): Analyses running at the same time in this process
+    """
+
+    def __init__(self, app, handler, max_workers=2):
+        self.app = app
+        self.handler = handler
+        self.executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix='analysis-job'
+        )
+
+    def enqueue(self, user_id, url) -> AnalysisJob:
+        """Store a queued job and hand it to the worker pool."""
+        job = AnalysisJob(id=str(uuid.uuid4()), user_id=user_id, url=url, status='queued')
+        db.session.add(job)
+        db.session.commit()
+        self.submit(job.id)
+        print(f"[DEBUG] JobQueue: Queued job {job.id} for {url}")
+        return job
+
+    def submit(self, job_id):
+        self.executor.submit(self._run, job_id)
+
+    def resume_queued(self, stale_after=None):
+        """
+        Submit jobs left queued, e.g. by a worker that shut down before running
+        them. Jobs claimed more than `stale_after` seconds ago (JOB_STALE_AFTER
+        by default) and still marked running belonged to a worker that died,
+        so they are put back in the queue first.
+        """
+        stale_after = JOB_STALE_AFTER if stale_after is None else stale_after
+        cutoff = datetime.utcnow() - timedelta(seconds=stale_after)
+        with self.app.app_context():
+            requeued = AnalysisJob.query.filter(
+                AnalysisJob.status == 'running', AnalysisJob.started_at < cutoff
+            ).update({'status': 'queued', 'started_at': None}, synchronize_session=False)
+            db.session.commit()
+            if requeued:
+                print(f"[DEBUG] JobQueue: Requeued {requeued} stale running jobs")
+            job_ids = [job_id for (job_id,) in
+                       db.session.query(AnalysisJob.id).filter_by(status='queued').all()]
+        for job_id in job_ids:
+            self.submit(job_id)
+        return len(job_ids)
+
+    def _claim(self, job_id) -> bool:
+        claimed = AnalysisJob.query.filter_by(id=job_id, status='queued').update(
+            {'status': 'running', 'started_at': datetime.utcnow()}, synchronize_session=False
+        )
+        db.session.commit()
+        return claimed == 1
+
+    def _finish(self, job_id, **fields):
+        AnalysisJob.query.filter_by(id=job_id).update(
+            dict(fields, finished_at=datetime.utcnow()), synchronize_session=False
+        )
+        db.session.commit()
+
+    def _run(self, job_id):
+        with self.app.app_context():
+            try:
+                if not self._claim(job_id):
+                    return
+                job = AnalysisJob.query.get(job_id)
+                user = User.query.get(job.user_id)
+                result, status_code = self.handler(user, job.url)
+                self._finish(job_id,
+                             status='succeeded' if status_code < 400 else 'failed',
+                             status_code=status_code,
+                             result=result,
+                             error=result.get('error'))
+                print(f"[DEBUG] JobQueue: Job {job_id} finished with status {status_code}")
+            except Exception as e:
+                print(f"[DEBUG] JobQueue: Job {job_id} failed: {e}")
+                db.session.rollback()
+                try:
+                    self._finish(job_id, status='failed', status_code=500, error=str(e))
+                except Exception as finish_error:
+                    db.session.rollback()
+                    print(f"[DEBUG] JobQueue: Could not record failure of job {job_id}: {finish_error}")
+            finally:
+                db.session.remove()
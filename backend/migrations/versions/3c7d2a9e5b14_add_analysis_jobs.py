@@ -0,0 +1,39 @@
+"""Add analysis_jobs table for background article analysis
+
+Revision ID: 3c7d2a9e5b14
+Revises: 78b9e4d2f91a
+Create Date: 2026-10-18 10:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic
+revision = '3c7d2a9e5b14'
+down_revision = '78b9e4d2f91a'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'analysis_jobs',
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('url', sa.String(length=500), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('status_code', sa.Integer(), nullable=True),
+        sa.Column('result', sa.JSON(), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('started_at', sa.DateTime(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_analysis_jobs_user_id', 'analysis_jobs', ['user_id'])
+
+
+def downgrade():
+    op.drop_index('ix_analysis_jobs_user_id', table_name='analysis_jobs')
+    op.drop_table('analysis_jobs')
@@ -0,0 +1,89 @@
+"""Add indexed canonical_url to article_searches
+
+Revision ID: 5a1e8f3b7c20
+Revises: 3c7d2a9e5b14
+Create Date: 2026-10-18 11:00:00.000000
+"""
+import re
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic
+revision = '5a1e8f3b7c20'
+down_revision = '3c7d2a9e5b14'
+branch_labels = None
+depends_on = None
+
+BACKFILL_BATCH_SIZE = 1000
+
+# Frozen copy of url_normalization.canonicalize_url as of this revision, so
+# later changes to the app's normalization can't change what this backfills
+TRACKING_PARAMS = {
+    'fbclid', 'gclid', 'dclid', 'msclkid', 'yclid', 'igshid', 'mc_cid', 'mc_eid',
+    '_ga', '_gl', 'ref', 'ref_src', 'ref_url', 'cmpid', 'smid', 'ito',
+    'amp', 'outputtype', 'usqp',
+}
+TRACKING_PARAM_PREFIXES = ('utm_', 'at_', 'pk_')
+HOST_PREFIXES = ('www.', 'm.', 'mobile.', 'amp.')
+_AMP_PATH_SUFFIX = re.compile(r'(/amp|\.amp)$', re.IGNORECASE)
+
+
+def canonicalize_url(url):
+    url = (url or '').strip()
+    try:
+        parts = urlsplit(url)
+        host = (parts.hostname or '').lower()
+        port = parts.port
+    except ValueError:
+        return url
+    if not host:
+        return url
+
+    for prefix in HOST_PREFIXES:
+        if host.startswith(prefix) and host.count('.') > 1:
+            host = host[len(prefix):]
+            break
+    if port and port not in (80, 443):
+        host = f"{host}:{port}"
+
+    path = re.sub(r'/{2,}', '/', parts.path)
+    path = _AMP_PATH_SUFFIX.sub('', path.rstrip('/'))
+    if path.lower().endswith('.amp.html'):
+        path = path[:-len('.amp.html')] + '.html'
+
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith(TRACKING_PARAM_PREFIXES)
+    )
+
+    return urlunsplit(('https', host, path or '/', urlencode(query), ''))
+
+
+def upgrade():
+    op.add_column('article_searches', sa.Column('canonical_url', sa.String(length=500), nullable=True))
+
+    # Existing rows get the key of the URL they were stored under
+    connection = op.get_bind()
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            sa.text("SELECT id, url FROM article_searches WHERE id > :last_id ORDER BY id LIMIT :limit"),
+            {'last_id': last_id, 'limit': BACKFILL_BATCH_SIZE}
+        ).fetchall()
+        if not rows:
+            break
+        connection.execute(
+            sa.text("UPDATE article_searches SET canonical_url = :canonical_url WHERE id = :id"),
+            [{'id': row.id, 'canonical_url': canonicalize_url(row.url)[:500]} for row in rows]
+        )
+        last_id = rows[-1].id
+
+    op.create_index('ix_article_searches_canonical_url', 'article_searches', ['canonical_url'])
+
+
+def downgrade():
+    op.drop_index('ix_article_searches_canonical_url', table_name='article_searches')
+    op.drop_column('article_searches', 'canonical_url')
@@ -0,0 +1,37 @@
+"""Add indexes for hot lookup columns
+
+Revision ID: 8d4b6c1f2e37
+Revises: 5a1e8f3b7c20
+Create Date: 2026-10-18 12:00:00.000000
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic
+revision = '8d4b6c1f2e37'
+down_revision = '5a1e8f3b7c20'
+branch_labels = None
+depends_on = None
+
+# (index name, table, columns). article_searches lookups go through the
+# canonical_url index added in 5a1e8f3b7c20, and users.email is already
+# covered by its unique constraint.
+INDEXES = [
+    ('ix_similar_articles_main_article_id', 'similar_articles', 'main_article_id'),
+    ('ix_trusted_websites_website_name', 'trusted_websites', 'website_name'),
+    ('ix_article_requests_user_id_created_at', 'article_requests', 'user_id, created_at'),
+]
+
+
+def upgrade():
+    # CONCURRENTLY avoids locking the tables against writes while building,
+    # but can't run inside a transaction
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} ({columns})")
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, _, _ in INDEXES:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
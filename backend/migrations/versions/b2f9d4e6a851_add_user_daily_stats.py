@@ -0,0 +1,42 @@
+"""Add user_daily_stats rollup table
+
+Revision ID: b2f9d4e6a851
+Revises: 8d4b6c1f2e37
+Create Date: 2026-10-18 13:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic
+revision = 'b2f9d4e6a851'
+down_revision = '8d4b6c1f2e37'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'user_daily_stats',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('article_count', sa.Integer(), nullable=False),
+        sa.Column('reliability_sum', sa.Float(precision=53), nullable=False),
+        sa.Column('reliability_count', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('user_id', 'day')
+    )
+
+    # Roll up existing requests; new ones are added by the ArticleRequest insert hook
+    op.execute("""
+        INSERT INTO user_daily_stats (user_id, day, article_count, reliability_sum, reliability_count)
+        SELECT r.user_id, date(r.created_at), count(*),
+               coalesce(sum(s.reliability_score), 0), count(s.reliability_score)
+        FROM article_requests r
+        JOIN article_searches s ON s.id = r.article_id
+        GROUP BY r.user_id, date(r.created_at)
+    """)
+
+
+def downgrade():
+    op.drop_table('user_daily_stats')
@@ -1,5 +1,8 @@
 from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime
+from sqlalchemy import event, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from werkzeug.security import generate_password_hash, check_password_hash
 
 db = SQLAlchemy()
@@ -32,6 +35,7 @@ class ArticleSearch(db.Model):
 
     id = db.Column(db.Integer, primary_key=True)
     url = db.Column(db.String(500), nullable=False)
+    canonical_url = db.Column(db.String(500), index=True)  # url_normalization.canonicalize_url, used as the cache key
     title = db.Column(db.String(500), nullable=False)
     reliability_score = db.Column(db.Float(precision=53))
     credibility_score = db.Column(db.Float(precision=53))
@@ -51,7 +55,7 @@ class SimilarArticle(db.Model):
     __tablename__ = 'similar_articles'
 
     id = db.Column(db.Integer, primary_key=True)
-    main_article_id = db.Column(db.Integer, db.ForeignKey('article_searches.id'), nullable=False)
+    main_article_id = db.Column(db.Integer, db.ForeignKey('article_searches.id'), nullable=False, index=True)
     title = db.Column(db.String(500), nullable=False)
     url = db.Column(db.String(500), nullable=False)
     similarity_score = db.Column(db.Float, nullable=False)
@@ -67,7 +71,79 @@ class SimilarArticle(db.Model):
 
 class ArticleRequest(db.Model):
     __tablename__ = 'article_requests'
+    __table_args__ = (
+        # Per-user time-range scans in /user/stats and /user/searches
+        db.Index('ix_article_requests_user_id_created_at', 'user_id', 'created_at'),
+    )
 
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
     article_id = db.Column(db.Integer, db.ForeignKey('article_searches.id'), primary_key=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+class UserDailyStats(db.Model):
+    """
+    Per-user, per-day rollup of article requests, kept up to date as requests
+    are inserted so /user/stats doesn't rescan a user's whole history.
+    """
+    __tablename__ = 'user_daily_stats'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)  # UTC date of ArticleRequest.created_at
+    article_count = db.Column(db.Integer, nullable=False, default=0)
+    reliability_sum = db.Column(db.Float(precision=53), nullable=False, default=0)
+    reliability_count = db.Column(db.Integer, nullable=False, default=0)  # requests with a reliability score
+
+
+@event.listens_for(ArticleRequest, 'after_insert')
+def _roll_up_article_request(mapper, connection, target):
+    """Add a new request to its user's daily rollup, in the same transaction."""
+    reliability = connection.execute(
+        select(ArticleSearch.reliability_score).where(ArticleSearch.id == target.article_id)
+    ).scalar()
+    created_at = target.created_at or datetime.utcnow()
+    insert = pg_insert if connection.dialect.name == 'postgresql' else sqlite_insert
+    table = UserDailyStats.__table__
+    statement = insert(table).values(
+        user_id=target.user_id,
+        day=created_at.date(),
+        article_count=1,
+        reliability_sum=reliability or 0,
+        reliability_count=0 if reliability is None else 1,
+    )
+    connection.execute(statement.on_conflict_do_update(
+        index_elements=[table.c.user_id, table.c.day],
+        set_={
+            'article_count': table.c.article_count + statement.excluded.article_count,
+            'reliability_sum': table.c.reliability_sum + statement.excluded.reliability_sum,
+            'reliability_count': table.c.reliability_count + statement.excluded.reliability_count,
+        },
+    ))
+
+
+class AnalysisJob(db.Model):
+    __tablename__ = 'analysis_jobs'
+
+    id = db.Column(db.String(36), primary_key=True)  # uuid4
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
+    url = db.Column(db.String(500), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='queued')  # queued, running, succeeded, failed
+    status_code = db.Column(db.Integer)  # HTTP status the synchronous endpoint would have returned
+    result = db.Column(db.JSON)
+    error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+
+    def to_dict(self):
+        return {
+            'job_id': self.id,
+            'url': self.url,
+            'status': self.status,
+            'status_code': self.status_code,
+            'result': self.result,
+            'error': self.error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+        }
@@ -0,0 +1,112 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from models import db, User
+
+# User columns a cached principal depends on; changing one drops the cache entry
+PRINCIPAL_ATTRIBUTES = ('email', 'subscription_plan', 'password_hash', 'is_verified')
+
+
+class Principal:
+    """
+    The parts of an authenticated user that cheap endpoints need, detached
+    from any database session.
+    """
+
+    __slots__ = ('id', 'email', 'subscription_plan', 'is_verified')
+
+    def __init__(self, id, email, subscription_plan, is_verified):
+        self.id = id
+        self.email = email
+        self.subscription_plan = subscription_plan
+        self.is_verified = is_verified
+
+    @classmethod
+    def from_user(cls, user: User):
+        return cls(user.id, user.email, user.subscription_plan, user.is_verified)
+
+
+class PrincipalCache:
+    """
+    Short-lived in-process cache of principals keyed by user id.
+
+    Entries are dropped as soon as this process changes a user's plan, password
+    or verification status. Other processes see such a change once their entry
+    expires, so `ttl` bounds how long a stale principal can be served.
+
+    Args:
+        ttl (float): Seconds an entry is served without re-reading the user
+        max_size (int): Entries kept, least recently used dropped first
+    """
+
+    def __init__(self, ttl=30, max_size=10000):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id) -> Optional[Principal]:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            stored_at, principal = entry
+            if time.monotonic() - stored_at > self.ttl:
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return principal
+
+    def put(self, principal: Principal):
+        with self._lock:
+            self._entries[principal.id] = (time.monotonic(), principal)
+            self._entries.move_to_end(principal.id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def resolve(self, user_id) -> Optional[Principal]:
+        """The cached principal for `user_id`, loading the user on a miss."""
+        principal = self.get(user_id)
+        if principal is None:
+            user = db.session.get(User, user_id)
+            if user is None:
+                return None
+            principal = Principal.from_user(user)
+            self.put(principal)
+        return principal
+
+
+principal_cache = PrincipalCache(
+    ttl=float(os.getenv('PRINCIPAL_CACHE_TTL', 30)),
+    max_size=int(os.getenv('PRINCIPAL_CACHE_SIZE', 10000)),
+)
+
+
+@event.listens_for(User, 'after_update')
+def _user_updated(mapper, connection, target):
+    state = inspect(target)
+    if any(state.attrs[name].history.has_changes() for name in PRINCIPAL_ATTRIBUTES):
+        principal_cache.invalidate(target.id)
+        # Drop it again on commit, in case it was re-read before the change landed
+        state.session.info.setdefault('stale_principals', set()).add(target.id)
+
+
+@event.listens_for(User, 'after_delete')
+def _user_deleted(mapper, connection, target):
+    principal_cache.invalidate(target.id)
+
+
+@event.listens_for(Session, 'after_commit')
+def _drop_stale_principals(session):
+    for user_id in session.info.pop('stale_principals', ()):
+        principal_cache.invalidate(user_id)
@@ -0,0 +1,262 @@
+import copy
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+
+from sqlalchemy import Column, DateTime, MetaData, String, Table, Text, create_engine, select
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+_NON_WORD = re.compile(r'[^\w]+', re.UNICODE)
+
+
+def normalize_query(query: str) -> str:
+    """
+    Reduce a search query to a cache key shared by trivially different titles.
+
+    Unicode-normalizes and lowercases the query and collapses punctuation and
+    whitespace, so "Fed Raises Rates — Again" and "fed raises rates again"
+    share a key.
+    """
+    query = unicodedata.normalize('NFKC', query or '').casefold()
+    return ' '.join(_NON_WORD.sub(' ', query).split())
+
+
+def _key_hash(key: str) -> str:
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+
+class DatabaseSearchStore:
+    """
+    Search results persisted in a search_result_cache table, shared by every
+    worker and kept across restarts.
+
+    Rows are keyed on the SHA-256 of the cache key, since keys built from long
+    article titles don't fit an indexed column; the key itself is kept
+    alongside for inspection.
+
+    Uses its own engine so it works outside a Flask app context (pipeline
+    stages run in worker threads). The table is created if it is missing,
+    which suits a dedicated SQLite file as well as the main Postgres database.
+
+    Args:
+        database_url (str): SQLAlchemy URL, e.g. sqlite:///search_cache.db
+    """
+
+    def __init__(self, database_url: str):
+        self.engine = create_engine(database_url, pool_pre_ping=True)
+        self.table = Table(
+            'search_result_cache', MetaData(),
+            Column('key_hash', String(64), primary_key=True),
+            Column('query_key', Text, nullable=False),
+            Column('results', Text, nullable=False),
+            Column('fetched_at', DateTime, nullable=False),
+        )
+        self.table.create(self.engine, checkfirst=True)
+
+    def get(self, key: str):
+        """(results, age in seconds) for `key`, or None."""
+        with self.engine.connect() as connection:
+            row = connection.execute(
+                select(self.table.c.results, self.table.c.fetched_at).where(self.table.c.key_hash == _key_hash(key))
+            ).first()
+        if row is None:
+            return None
+        return json.loads(row.results), (datetime.utcnow() - row.fetched_at).total_seconds()
+
+    def set(self, key: str, results):
+        insert = postgresql_insert if self.engine.dialect.name == 'postgresql' else sqlite_insert
+        statement = insert(self.table).values(key_hash=_key_hash(key), query_key=key,
+                                              results=json.dumps(results), fetched_at=datetime.utcnow())
+        with self.engine.begin() as connection:
+            connection.execute(statement.on_conflict_do_update(
+                index_elements=[self.table.c.key_hash],
+                set_={'results': statement.excluded.results, 'fetched_at': statement.excluded.fetched_at},
+            ))
+
+    def purge(self, max_age: float):
+        """Delete rows older than `max_age` seconds."""
+        cutoff = datetime.utcnow() - timedelta(seconds=max_age)
+        with self.engine.begin() as connection:
+            connection.execute(self.table.delete().where(self.table.c.fetched_at < cutoff))
+
+
+class SearchResultCache:
+    """
+    TTL cache of search results keyed by normalized query, in memory with an
+    optional shared store behind it.
+
+    A result younger than `ttl` is served as is. With `stale_ttl` set, a
+    result up to `stale_ttl` seconds past its TTL is still served, and a
+    single background refresh replaces it (stale-while-revalidate). Anything
+    older is fetched on the calling thread. Fetch errors and empty results
+    are never cached. Every `purge_every` writes, rows that can no longer be
+    served are deleted from the store.
+
+    Args:
+        ttl (float): Seconds a result is fresh
+        stale_ttl (float): Extra seconds a stale result may be served while it refreshes; 0 disables
+        max_size (int): Queries kept in memory, least recently used dropped first
+        store (DatabaseSearchStore): Optional shared backing store
+        purge_every (int): Store writes between purges of expired rows
+    """
+
+    def __init__(self, ttl=86400, stale_ttl=0, max_size=1024, store: Optional[DatabaseSearchStore] = None,
+                 purge_every=100):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_size = max_size
+        self.store = store
+        self.purge_every = purge_every
+        self._store_writes = 0
+        self._entries = OrderedDict()
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self._counters = {'hits': 0, 'stale_hits': 0, 'store_hits': 0, 'misses': 0,
+                          'refreshes': 0, 'errors': 0}
+
+    def get_or_fetch(self, key: str, fetch: Callable[[], list]) -> list:
+        """Cached results for `key`, calling `fetch` on a miss. Errors from `fetch` propagate."""
+        entry = self._get(key)
+        if entry is not None:
+            results, age = entry
+            if age <= self.ttl:
+                self._count('hits')
+                return results
+            if age <= self.ttl + self.stale_ttl:
+                self._count('stale_hits')
+                self._refresh_in_background(key, fetch)
+                return results
+
+        self._count('misses')
+        return self._fetch(key, fetch)
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._counters, size=len(self._entries))
+        lookups = stats['hits'] + stats['stale_hits'] + stats['misses']
+        stats['hit_rate'] = (stats['hits'] + stats['stale_hits']) / lookups if lookups else 0.0
+        return stats
+
+    def invalidate(self, key: Optional[str] = None):
+        """Drop one query, or every query, from memory."""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def _count(self, counter):
+        with self._lock:
+            self._counters[counter] += 1
+
+    def _get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                stored_at, results = entry
+                return copy.deepcopy(results), time.time() - stored_at
+        if self.store is None:
+            return None
+        try:
+            entry = self.store.get(key)
+        except Exception as e:
+            print(f"[DEBUG] SearchResultCache: Could not read from store: {e}")
+            return None
+        if entry is not None:
+            results, age = entry
+            self._count('store_hits')
+            self._remember(key, results, time.time() - age)
+        return entry
+
+    def _remember(self, key, results, stored_at):
+        with self._lock:
+            self._entries[key] = (stored_at, copy.deepcopy(results))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def _fetch(self, key, fetch):
+        try:
+            results = fetch()
+        except Exception:
+            self._count('errors')
+            raise
+        if results:
+            self._remember(key, results, time.time())
+            if self.store is not None:
+                try:
+                    self.store.set(key, results)
+                except Exception as e:
+                    print(f"[DEBUG] SearchResultCache: Could not write to store: {e}")
+                else:
+                    self._purge_periodically()
+        return results
+
+    def _purge_periodically(self):
+        with self._lock:
+            self._store_writes += 1
+            due = self._store_writes % self.purge_every == 0
+        if not due:
+            return
+        try:
+            self.store.purge(self.ttl + self.stale_ttl)
+        except Exception as e:
+            print(f"[DEBUG] SearchResultCache: Could not purge expired results: {e}")
+
+    def _refresh_in_background(self, key, fetch):
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+            self._counters['refreshes'] += 1
+
+        def refresh():
+            try:
+                self._fetch(key, fetch)
+            except Exception as e:
+                print(f"[DEBUG] SearchResultCache: Background refresh of {key!r} failed: {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=refresh, name='search-cache-refresh', daemon=True).start()
+
+
+_search_cache = None
+_search_cache_lock = threading.Lock()
+
+
+def get_search_cache() -> SearchResultCache:
+    """
+    Return the process-wide search cache, configured by SEARCH_CACHE_TTL,
+    SEARCH_CACHE_STALE_TTL and SEARCH_CACHE_SIZE. Setting SEARCH_CACHE_URL
+    (a Postgres or SQLite URL) backs it with a shared search_result_cache table,
+    purged of expired rows every SEARCH_CACHE_PURGE_EVERY writes.
+    """
+    global _search_cache
+    with _search_cache_lock:
+        if _search_cache is None:
+            store = None
+            database_url = os.getenv('SEARCH_CACHE_URL')
+            if database_url:
+                try:
+                    store = DatabaseSearchStore(database_url)
+                except Exception as e:
+                    print(f"[DEBUG] SearchResultCache: Store unavailable, caching in memory only: {e}")
+            _search_cache = SearchResultCache(
+                ttl=float(os.getenv('SEARCH_CACHE_TTL', 86400)),
+                stale_ttl=float(os.getenv('SEARCH_CACHE_STALE_TTL', 0)),
+                max_size=int(os.getenv('SEARCH_CACHE_SIZE', 1024)),
+                store=store,
+                purge_every=max(int(os.getenv('SEARCH_CACHE_PURGE_EVERY', 100)), 1),
+            )
+        return _search_cache
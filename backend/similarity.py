@@ -0,0 +1,107 @@
+import math
+import os
+import re
+from collections import Counter
+from typing import Dict, List
+
+from embedding_service import cosine_similarity, get_embedding_service
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9']+")
+
+_STOP_WORDS = frozenset("""
+a about after all also an and any are as at be been but by can could did do does for from had has have
+he her his how i if in into is it its just more most no not of on one or other our out over said she so
+some than that the their them then there these they this to up was we were what when which who will
+with would you your
+""".split())
+
+
+class GeminiSimilarityBackend:
+    """Cosine similarity of Gemini text embeddings (remote API, cached)."""
+
+    name = 'gemini'
+
+    def scores(self, main_text: str, texts: List[str]) -> List[float]:
+        main_vector, *vectors = get_embedding_service().embed_many([main_text] + texts)
+        return [cosine_similarity(vector, main_vector) for vector in vectors]
+
+
+class TfidfSimilarityBackend:
+    """
+    Local TF-IDF cosine similarity over unigrams and bigrams.
+
+    Runs in-process on the CPU with no network access or model download. IDF
+    weights come from the texts being compared, i.e. the main article and its
+    candidates. Scores are not calibrated to the Gemini embedding scale; see
+    benchmarks/similarity_benchmark.py for how closely the two agree.
+    """
+
+    name = 'tfidf'
+
+    @staticmethod
+    def _terms(text: str) -> Counter:
+        tokens = [t for t in _TOKEN_PATTERN.findall(text.lower()) if t not in _STOP_WORDS]
+        terms = Counter(tokens)
+        terms.update(f"{a} {b}" for a, b in zip(tokens, tokens[1:]))
+        return terms
+
+    @staticmethod
+    def _cosine(v1: Dict[str, float], v2: Dict[str, float]) -> float:
+        if len(v1) > len(v2):
+            v1, v2 = v2, v1
+        dot = sum(weight * v2.get(term, 0.0) for term, weight in v1.items())
+        norm = math.sqrt(sum(w * w for w in v1.values())) * math.sqrt(sum(w * w for w in v2.values()))
+        return dot / norm if norm else 0.0
+
+    def scores(self, main_text: str, texts: List[str]) -> List[float]:
+        documents = [self._terms(text) for text in [main_text] + texts]
+
+        document_frequency = Counter()
+        for terms in documents:
+            document_frequency.update(terms.keys())
+        n = len(documents)
+        idf = {term: math.log((1 + n) / (1 + df)) + 1 for term, df in document_frequency.items()}
+
+        # Sublinear term frequency keeps repeated boilerplate from dominating
+        vectors = [{term: (1 + math.log(count)) * idf[term] for term, count in terms.items()}
+                   for terms in documents]
+        main_vector, *candidate_vectors = vectors
+        return [self._cosine(vector, main_vector) for vector in candidate_vectors]
+
+
+SIMILARITY_BACKENDS = {
+    GeminiSimilarityBackend.name: GeminiSimilarityBackend,
+    TfidfSimilarityBackend.name: TfidfSimilarityBackend,
+}
+
+
+def get_similarity_backend(name=None):
+    """Instantiate a backend by name, defaulting to SIMILARITY_BACKEND (gemini)."""
+    name = name or os.getenv('SIMILARITY_BACKEND', GeminiSimilarityBackend.name)
+    if name not in SIMILARITY_BACKENDS:
+        raise ValueError(f"Unknown similarity backend '{name}'. "
+                         f"Choose from: {', '.join(SIMILARITY_BACKENDS)}")
+    return SIMILARITY_BACKENDS[name]()
+
+
+def similarity_scores(main_text: str, texts: List[str]) -> List[float]:
+    """
+    Score each text's similarity to the main text with the configured backend.
+
+    If that backend fails (no network, quota exhausted) and SIMILARITY_FALLBACK
+    names another backend, that one is used instead. Off by default: backends
+    score on different scales, and stored scores feed the reliability model,
+    which was trained on embedding similarities.
+    """
+    if not texts:
+        return []
+
+    backend = get_similarity_backend()
+    try:
+        return backend.scores(main_text, texts)
+    except Exception as e:
+        fallback = os.getenv('SIMILARITY_FALLBACK', '')
+        if not fallback or fallback == backend.name:
+            raise
+        print(f"[DEBUG] Similarity backend '{backend.name}' failed, using '{fallback}': {e}")
+        return get_similarity_backend(fallback).scores(main_text, texts)
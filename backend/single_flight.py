@@ -0,0 +1,112 @@
+import hashlib
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from sqlalchemy import text
+
+from models import db
+
+# Longest a request waits for another worker's analysis before running its own
+SINGLE_FLIGHT_TIMEOUT = float(os.getenv('SINGLE_FLIGHT_TIMEOUT', 180))
+
+_POLL_INTERVAL = 0.25
+
+
+class _KeyedLocks:
+    """One lock per key, dropped again once nobody holds or waits for it."""
+
+    def __init__(self):
+        self._locks = {}
+        self._guard = threading.Lock()
+
+    def acquire(self, key, timeout) -> bool:
+        with self._guard:
+            entry = self._locks.setdefault(key, [threading.Lock(), 0])
+            entry[1] += 1
+        if entry[0].acquire(timeout=timeout):
+            return True
+        self._forget(key)
+        return False
+
+    def release(self, key):
+        self._locks[key][0].release()
+        self._forget(key)
+
+    def _forget(self, key):
+        with self._guard:
+            entry = self._locks[key]
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self._locks[key]
+
+
+_local_locks = _KeyedLocks()
+
+
+def advisory_key(key: str) -> int:
+    """Map a string to the signed 64-bit id pg_advisory_lock expects."""
+    return int.from_bytes(hashlib.sha256(key.encode('utf-8')).digest()[:8], 'big', signed=True)
+
+
+def _acquire_advisory_lock(key, deadline):
+    """Hold a Postgres advisory lock on its own connection; None on timeout."""
+    connection = db.engine.connect()
+    try:
+        while True:
+            if connection.execute(text("SELECT pg_try_advisory_lock(:key)"), {'key': key}).scalar():
+                return connection
+            if time.monotonic() >= deadline:
+                connection.close()
+                return None
+            time.sleep(_POLL_INTERVAL)
+    except Exception:
+        connection.close()
+        raise
+
+
+@contextmanager
+def single_flight(key: str, timeout: float = None):
+    """
+    Let only one caller at a time run the block for `key`, across threads and
+    (on Postgres) across worker processes.
+
+    Callers for the same key wait until the current holder leaves the block,
+    so they should re-check for its stored result before doing the work
+    themselves. Callers should end their database transaction before
+    entering, or each waiter keeps a pooled connection checked out (idle in
+    transaction) for as long as it waits. If the wait exceeds `timeout` (SINGLE_FLIGHT_TIMEOUT by
+    default) the block runs anyway rather than failing the request.
+
+    Args:
+        key (str): What is being computed, e.g. a normalized URL
+        timeout (float): Seconds to wait for the current holder
+    """
+    timeout = SINGLE_FLIGHT_TIMEOUT if timeout is None else timeout
+    deadline = time.monotonic() + timeout
+
+    # Waiters in this process queue here; only the holder polls for the
+    # advisory lock, on a connection of its own
+    local = _local_locks.acquire(key, timeout)
+    connection = None
+    try:
+        if not local:
+            print(f"[DEBUG] single_flight: Timed out waiting for {key}, proceeding without lock")
+        elif db.engine.dialect.name == 'postgresql':
+            connection = _acquire_advisory_lock(advisory_key(key), deadline)
+            if connection is None:
+                print(f"[DEBUG] single_flight: Timed out waiting for advisory lock on {key}, proceeding")
+        yield
+    finally:
+        if connection is not None:
+            try:
+                connection.execute(text("SELECT pg_advisory_unlock(:key)"), {'key': advisory_key(key)})
+            except Exception as e:
+                # Advisory locks outlive pooled connections; drop the connection to free it
+                print(f"[DEBUG] single_flight: Could not unlock {key}: {e}")
+                connection.invalidate()
+            finally:
+                connection.close()
+        if local:
+            _local_locks.release(key)
@@ -0,0 +1,94 @@
+import gzip
+import json
+import pkgutil
+import re
+import threading
+from functools import lru_cache
+from typing import FrozenSet, List, Set
+
+# "Words" of letters/apostrophes, 2+ chars
+_WORD_PATTERN = re.compile(r"\b[a-zA-Z']{2,}\b")
+
+# Distinct tokens remembered by SpellCheckEngine.is_misspelled
+TOKEN_CACHE_SIZE = 65536
+
+
+class SpellCheckResult:
+    """Outcome of checking one text."""
+
+    __slots__ = ('words', 'misspelled')
+
+    def __init__(self, words: List[str], misspelled: Set[str]):
+        self.words = words
+        self.misspelled = misspelled
+
+    @property
+    def error_count(self) -> int:
+        return len(self.misspelled)
+
+    @property
+    def error_pct(self) -> float:
+        """Distinct misspellings per checked word (as a fraction, not x100)."""
+        return len(self.misspelled) / (len(self.words) or 1)
+
+
+class SpellCheckEngine:
+    """
+    Spell checker over a frozen lexicon, built once and shared.
+
+    Gives the same answers as pyspellchecker's SpellChecker.unknown() for
+    the tokens get_misspellings produces, without reloading the compressed
+    word-frequency dictionary on every call. Per-token results are memoized.
+
+    Args:
+        lexicon (frozenset): Known words, lowercase
+    """
+
+    def __init__(self, lexicon: FrozenSet[str]):
+        self.lexicon = lexicon
+        # pyspellchecker skips tokens more than 3 letters longer than any known word
+        self.max_checked_length = max(map(len, lexicon), default=0) + 3
+        self.is_misspelled = lru_cache(maxsize=TOKEN_CACHE_SIZE)(self._is_misspelled)
+
+    @classmethod
+    def from_language(cls, language='en'):
+        """Load pyspellchecker's bundled word list for `language`."""
+        data = pkgutil.get_data('spellchecker', f'resources/{language}.json.gz')
+        words = json.loads(gzip.decompress(data).decode('utf-8'))
+        return cls(frozenset(words))
+
+    def _is_misspelled(self, word: str) -> bool:
+        if len(word) > self.max_checked_length:
+            return False
+        return word not in self.lexicon
+
+    def unknown(self, words) -> Set[str]:
+        """The subset of lowercase `words` that are not in the lexicon."""
+        return {w for w in words if self.is_misspelled(w)}
+
+    def check(self, text: str) -> SpellCheckResult:
+        """
+        Tokenize and spell-check a text in one pass.
+
+        Capitalized tokens are skipped as likely proper nouns; the rest are
+        lowercased and checked.
+
+        Returns:
+            SpellCheckResult: The checked words, the distinct misspellings,
+            and their count and percentage
+        """
+        words = [tok.lower() for tok in _WORD_PATTERN.findall(text) if not tok[0].isupper()]
+        return SpellCheckResult(words, self.unknown(words))
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_spell_checker() -> SpellCheckEngine:
+    """Return the shared English spell checker, loading the lexicon on first use."""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = SpellCheckEngine.from_language('en')
+        return _engine
@@ -0,0 +1,88 @@
+import re
+from typing import Optional
+from urllib.parse import parse_qsl, urlencode, urljoin, urlsplit, urlunsplit
+
+from domains import hostname_of, registered_domain
+
+# Query parameters that only track where a click came from
+TRACKING_PARAMS = {
+    'fbclid', 'gclid', 'dclid', 'msclkid', 'yclid', 'igshid', 'mc_cid', 'mc_eid',
+    '_ga', '_gl', 'ref', 'ref_src', 'ref_url', 'cmpid', 'smid', 'ito',
+    'amp', 'outputtype', 'usqp',
+}
+TRACKING_PARAM_PREFIXES = ('utm_', 'at_', 'pk_')
+
+# Host prefixes for mobile, AMP and "www" variants of the same site
+HOST_PREFIXES = ('www.', 'm.', 'mobile.', 'amp.')
+
+_AMP_PATH_SUFFIX = re.compile(r'(/amp|\.amp)$', re.IGNORECASE)
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    Reduce a URL to a key shared by every variant of the same article.
+
+    Lowercases scheme and host, uses https, drops www./m./amp. host prefixes,
+    default ports, fragments, tracking parameters (utm_*, fbclid, ...), AMP
+    path suffixes and trailing slashes, and sorts the remaining query
+    parameters.
+
+    Args:
+        url (str): Any URL as submitted by a user or found in a page
+
+    Returns:
+        str: The canonical form; unparseable input is returned stripped
+    """
+    url = (url or '').strip()
+    try:
+        parts = urlsplit(url)
+        host = (parts.hostname or '').lower()
+        port = parts.port
+    except ValueError:
+        return url
+    if not host:
+        return url
+
+    for prefix in HOST_PREFIXES:
+        if host.startswith(prefix) and host.count('.') > 1:
+            host = host[len(prefix):]
+            break
+    if port and port not in (80, 443):
+        host = f"{host}:{port}"
+
+    path = re.sub(r'/{2,}', '/', parts.path)
+    path = _AMP_PATH_SUFFIX.sub('', path.rstrip('/'))
+    if path.lower().endswith('.amp.html'):
+        path = path[:-len('.amp.html')] + '.html'
+
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith(TRACKING_PARAM_PREFIXES)
+    )
+
+    return urlunsplit(('https', host, path or '/', urlencode(query), ''))
+
+
+def find_canonical_url(soup, page_url: str) -> Optional[str]:
+    """
+    The page's <link rel="canonical"> target as an absolute URL, if it has one
+    on the same registered domain as the page.
+
+    Analyses are stored under this URL, so a canonical pointing at another
+    site (a syndicated copy, or a page claiming to be someone else's article)
+    is ignored rather than letting the page stand in for that site's article.
+    """
+    link = soup.find('link', rel='canonical', href=True)
+    if not link:
+        return None
+    href = link['href'].strip()
+    if not href:
+        return None
+    canonical = urljoin(page_url, href)
+    if urlsplit(canonical).scheme not in ('http', 'https'):
+        return None
+    page_domain = registered_domain(hostname_of(page_url))
+    if not page_domain or registered_domain(hostname_of(canonical)) != page_domain:
+        print(f"[DEBUG] Ignoring canonical URL {canonical} on another site than {page_url}")
+        return None
+    return canonical
@@ -1,12 +1,16 @@
+import os
+import threading
+import time
+
 from sqlalchemy import text  
 from models import db
 from urllib.parse import urlparse
 
-import tldextract
+from domains import domain_name
 
 def get_domain_from_url(url):
     """
-    Extract the main domain name from a URL using tldextract.
+    Extract the main domain name from a URL.
 
     Args:
         url (str): The full URL to parse
@@ -18,27 +22,72 @@ def get_domain_from_url(url):
         return ""
 
     try:
-        # Extract domain parts using tldextract
-        extracted = tldextract.extract(url)
-
-        # Return the registered domain (without subdomains)
-        # This handles all edge cases with different TLDs properly
-        return extracted.domain
+        return domain_name(url)
     except Exception as e:
         print(f"Error extracting domain from {url}: {e}")
         return ""
 
+class TrustedWebsites:
+    """
+    In-memory copy of the trusted_websites table (website name -> credibility
+    score), so credibility checks don't query the database.
+
+    The table is loaded on first use and reloaded once it is older than
+    `refresh_interval` seconds. The app never writes trusted_websites (it is
+    maintained directly in the database), so the interval is the only refresh
+    signal: an edit shows up within TRUSTED_WEBSITES_REFRESH seconds, or at
+    once after a restart. While one thread reloads, others keep using the
+    previous copy. If a reload fails, the previous copy stays in use until the
+    next interval.
+    """
+
+    def __init__(self, refresh_interval=300):
+        self.refresh_interval = refresh_interval
+        self._scores = None
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    def refresh(self):
+        """Reload the table now. Needs an app context."""
+        rows = db.session.execute(text("SELECT website_name, credibility_score FROM trusted_websites")).fetchall()
+        scores = {}
+        for website_name, credibility_score in rows:
+            # Same name twice: keep the first, like the old single-row lookup
+            scores.setdefault(website_name, credibility_score)
+        self._scores = scores
+        self._loaded_at = time.monotonic()
+        print(f"[DEBUG] TrustedWebsites: Loaded {len(scores)} websites")
+
+    def scores(self):
+        if self._scores is not None and time.monotonic() - self._loaded_at < self.refresh_interval:
+            return self._scores
+        # Only one thread reloads; the rest carry on with the copy they have
+        if self._lock.acquire(blocking=self._scores is None):
+            try:
+                if self._scores is None or time.monotonic() - self._loaded_at >= self.refresh_interval:
+                    self.refresh()
+            except Exception as e:
+                if self._scores is None:
+                    raise
+                print(f"[DEBUG] TrustedWebsites: Refresh failed, keeping previous table: {e}")
+                self._loaded_at = time.monotonic()
+            finally:
+                self._lock.release()
+        return self._scores
+
+
+trusted_websites = TrustedWebsites(refresh_interval=float(os.getenv('TRUSTED_WEBSITES_REFRESH', 300)))
+
+
 def check_website_score(url):
     domain = get_domain_from_url(url)
 
     try:
-        query = text("SELECT credibility_score FROM trusted_websites WHERE website_name = :domain")
-        website = db.session.execute(query, {"domain": domain}).fetchone()
-
-        if website:
-            return {"website": domain, "credibility_score": website[0]}
+        scores = trusted_websites.scores()
+        if domain in scores:
+            return {"website": domain, "credibility_score": scores[domain]}
         else:
             return {"website": domain, "credibility_score": None, "message": "Website not found in database."}
 
     except Exception as e:
-        return {"error": str(e)}
\ No newline at end of file
+        return {"error": str(e)}
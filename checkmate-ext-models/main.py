@@ -22,7 +22,8 @@ tokenizer = None
 reliability_model = None
 reliability_scaler = None
 
-executor = concurrent.futures.ThreadPoolExecutor(max_workers=2)
+# One worker per classifier so /analyze can run all of them at once
+executor = concurrent.futures.ThreadPoolExecutor(max_workers=3)
 
 @app.on_event("startup")
 async def load_models():
@@ -69,6 +70,22 @@ class InputText(BaseModel):
     text: str
 
 
+class AnalyzeRequest(BaseModel):
+    title: str
+    text: str
+
+
+def subjectivity_response(result: dict) -> dict:
+    """ Shapes a subjectivity classifier result for the API """
+    return {
+        "subjective_sentences": result.get("subjective", []),
+        "objective_sentences": result.get("objective", []),
+        "subjectivity_prob": result.get("subjectivity_prob", []),
+        "objectivity_prob": result.get("objectivity_prob", []),
+        "class_label": result.get("class_label", None),
+    }
+
+
 @app.get("/")
 def read_root():
     return {"message": "FastAPI running with Title Subjectivity Classifier, Subjectivity Classifier, Sentence Transformer & Political Analyzer!"}
@@ -82,13 +99,7 @@ async def titleSubjectivity(input_data: InputText):
 
     result = title_subjectivity_classifier.classify_sentences_in_text(input_data.text)
 
-    return {
-        "subjective_sentences": result.get("subjective", []),
-        "objective_sentences": result.get("objective", []),
-        "subjectivity_prob": result.get("subjectivity_prob", []),
-        "objectivity_prob": result.get("objectivity_prob", []),
-        "class_label": result.get("class_label", None),
-    }
+    return subjectivity_response(result)
 
 
 @app.post("/subjectivity")
@@ -100,13 +111,7 @@ async def subjectivity(input_data: InputText):
     loop = asyncio.get_event_loop()
     result = await loop.run_in_executor(executor, subjectivity_classifier.classify_sentences_in_text, input_data.text)
 
-    return {
-        "subjective_sentences": result.get("subjective", []),
-        "objective_sentences": result.get("objective", []),
-        "subjectivity_prob": result.get("subjectivity_prob", []),
-        "objectivity_prob": result.get("objectivity_prob", []),
-        "class_label": result.get("class_label", None),
-    }
+    return subjectivity_response(result)
 
 
 @app.post("/political")
@@ -124,6 +129,52 @@ async def political_bias(input_data: InputText):
     }
 
 
+@app.post("/analyze")
+async def analyze(input_data: AnalyzeRequest):
+    """
+    Runs body subjectivity, title subjectivity and political bias in one request.
+    The classifiers run in parallel; one that is unavailable or fails is returned
+    as null with its error, and the others are still returned.
+    """
+    loop = asyncio.get_event_loop()
+    tasks = {}
+    errors = {}
+
+    if subjectivity_classifier is not None:
+        tasks["subjectivity"] = loop.run_in_executor(
+            executor, subjectivity_classifier.classify_sentences_in_text, input_data.text)
+    else:
+        errors["subjectivity"] = "Subjectivity classifier not initialized"
+
+    if title_subjectivity_classifier is not None:
+        tasks["title_subjectivity"] = loop.run_in_executor(
+            executor, title_subjectivity_classifier.classify_sentences_in_text, input_data.title)
+    else:
+        errors["title_subjectivity"] = "Title subjectivity classifier not initialized"
+
+    if political_classifier is not None and tokenizer is not None:
+        tasks["political"] = loop.run_in_executor(executor, classify_political_bias, input_data.text)
+    else:
+        errors["political"] = "Political Bias Model not initialized"
+
+    results = await asyncio.gather(*tasks.values(), return_exceptions=True)
+    response = {"subjectivity": None, "title_subjectivity": None, "political": None}
+    for name, result in zip(tasks.keys(), results):
+        if isinstance(result, Exception):
+            errors[name] = str(result)
+        elif name == "political":
+            prediction, probabilities = result
+            response[name] = {"prediction": prediction, "probabilities": probabilities}
+        else:
+            response[name] = subjectivity_response(result)
+
+    if len(errors) == len(response):
+        raise HTTPException(status_code=500, detail=errors)
+
+    response["errors"] = errors
+    return response
+
+
 def classify_political_bias(text: str):
     """Predicts political bias category and returns probabilities"""
     label_mapping = {0: "Left", 1: "Center", 2: "Right"}
@@ -6,9 +6,12 @@ is_subjective = [1., 0.]
 is_objective = [0., 1.]
 
 
+# Stateless, so one instance is shared by every call (and every request)
+_tokenizer = nltk.tokenize.TweetTokenizer()
+
+
 def get_words(text):
-    tokenizer = nltk.tokenize.TweetTokenizer()
-    words = tokenizer.tokenize(utils.to_unicode(text))
+    words = _tokenizer.tokenize(utils.to_unicode(text))
     return words
 
 